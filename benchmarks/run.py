@@ -0,0 +1,273 @@
+# type: ignore
+"""
+Benchmarks for tippo's hot paths.
+
+Writes the results as JSON (to stdout, or to a file with `--output`). With
+`--compare`, results are compared against a baseline file written by a previous run,
+and the script exits with a non-zero status if any benchmark got slower than the
+baseline by more than the threshold.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import tippo  # noqa: E402
+
+BENCHMARKS = []
+
+# Minimum total time for a single timing repetition (in seconds).
+MIN_TIME = 0.05
+
+
+def benchmark(name):
+    def decorator(func):
+        BENCHMARKS.append((name, func))
+        return func
+
+    return decorator
+
+
+def _timeit(func, repeat):
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < MIN_TIME and number < 10**7:
+        number *= 10
+    return [t / number for t in timer.repeat(repeat, number)], number
+
+
+@benchmark("import")
+def bench_import(repeat):
+    code = (
+        "import sys, timeit; t = timeit.default_timer(); import tippo; "
+        "sys.stdout.write(repr(timeit.default_timer() - t))"
+    )
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE="")
+    times = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, "-c", code], env=env)
+        times.append(float(output.decode("ascii")))
+    return times, 1
+
+
+FORMS = [
+    int,
+    tippo.List,
+    tippo.List[int],
+    tippo.Dict[str, tippo.List[int]],
+    tippo.Optional[int],
+    tippo.Callable[[int, str], bool],
+    tippo.Tuple[int, ...],
+    tippo.Literal["a", "b"],
+]
+
+
+def _each(func):
+    def run():
+        for form in FORMS:
+            func(form)
+
+    return run
+
+
+@benchmark("get_name")
+def bench_get_name(repeat):
+    return _timeit(_each(tippo.get_name), repeat)
+
+
+@benchmark("get_origin")
+def bench_get_origin(repeat):
+    return _timeit(_each(tippo.get_origin), repeat)
+
+
+@benchmark("get_args")
+def bench_get_args(repeat):
+    return _timeit(_each(tippo.get_args), repeat)
+
+
+@benchmark("get_builtin")
+def bench_get_builtin(repeat):
+    return _timeit(_each(tippo.get_builtin), repeat)
+
+
+@benchmark("get_typing")
+def bench_get_typing(repeat):
+    return _timeit(_each(tippo.get_typing), repeat)
+
+
+@benchmark("get_builtin_deep")
+def bench_get_builtin_deep(repeat):
+    return _timeit(_each(lambda f: tippo.get_builtin(f, deep=True)), repeat)
+
+
+T = tippo.TypeVar("T")
+
+
+class Plain(tippo.Generic[T]):
+    pass
+
+
+class Slotted(tippo.Generic[T]):
+    __slots__ = ("__weakref__",)
+
+
+@benchmark("getitem_plain")
+def bench_getitem_plain(repeat):
+    return _timeit(lambda: Plain[int], repeat)
+
+
+@benchmark("getitem_slotted_weakref")
+def bench_getitem_slotted_weakref(repeat):
+    return _timeit(lambda: Slotted[int], repeat)
+
+
+# The unpatched `GenericMeta.__getitem__` only exists when the weakref fix is applied.
+_original_getitem = getattr(tippo, "_original_getitem", None)
+if _original_getitem is not None:
+
+    @benchmark("getitem_slotted_weakref_unpatched")
+    def bench_getitem_slotted_weakref_unpatched(repeat):
+        return _timeit(lambda: _original_getitem(Slotted, int), repeat)
+
+
+@tippo.runtime_checkable
+class SupportsName(tippo.Protocol):
+    def name(self):
+        pass
+
+
+class Named(object):
+    def name(self):
+        pass
+
+
+@benchmark("protocol_isinstance")
+def bench_protocol_isinstance(repeat):
+    named, number = Named(), 3
+    return _timeit(
+        lambda: (isinstance(named, SupportsName), isinstance(number, SupportsName)),
+        repeat,
+    )
+
+
+@benchmark("protocol_supports")
+def bench_protocol_supports(repeat):
+    named, number = Named(), 3
+    return _timeit(
+        lambda: (
+            tippo.supports(named, SupportsName),
+            tippo.supports(number, SupportsName),
+        ),
+        repeat,
+    )
+
+
+def run(names=None, repeat=5):
+    """
+    Run benchmarks.
+
+    :param names: Names of the benchmarks to run (None for all).
+    :param repeat: Number of timing repetitions.
+    :return: JSON-serializable results.
+    """
+    results = {}
+    for name, func in BENCHMARKS:
+        if names and name not in names:
+            continue
+        times, number = func(repeat)
+        times.sort()
+        results[name] = {
+            "min": times[0],
+            "median": times[len(times) // 2],
+            "number": number,
+            "repeat": repeat,
+        }
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "benchmarks": results,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results against a baseline.
+
+    :param results: Results.
+    :param baseline: Baseline results.
+    :param threshold: Maximum allowed slowdown ratio (0.25 for 25%).
+    :return: Names of the benchmarks that regressed.
+    """
+    regressions = []
+    for name, result in sorted(results["benchmarks"].items()):
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            print("{:<36} {:>12}".format(name, "new"), file=sys.stderr)
+            continue
+        ratio = result["min"] / base["min"]
+        status = ""
+        if ratio > 1 + threshold:
+            status = "REGRESSED"
+            regressions.append(name)
+        print(
+            "{:<36} {:>11.2f}x {}".format(name, ratio, status).rstrip(),
+            file=sys.stderr,
+        )
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("-o", "--output", help="write the results to a JSON file")
+    parser.add_argument("-c", "--compare", help="baseline JSON file to compare to")
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="maximum allowed slowdown when comparing (default: 0.25)",
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("-l", "--list", action="store_true", help="list benchmarks")
+    options = parser.parse_args(args)
+
+    if options.list:
+        for name, _ in BENCHMARKS:
+            print(name)
+        return 0
+
+    results = run(options.names, options.repeat)
+    output = json.dumps(results, indent=2, separators=(",", ": "), sort_keys=True)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("python") != results["python"]:
+            print(
+                "warning: baseline is for Python {}".format(baseline.get("python")),
+                file=sys.stderr,
+            )
+        regressions = compare(results, baseline, options.threshold)
+        if regressions:
+            print("regressed: {}".format(", ".join(regressions)), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
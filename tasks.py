@@ -2,7 +2,7 @@
 
 from invoke import task
 
-PATHS = "tippo setup.py tasks.py docs/source/conf.py tests"
+PATHS = "tippo setup.py tasks.py docs/source/conf.py tests benchmarks"
 
 
 @task
@@ -36,6 +36,16 @@ def tests(c):
     c.run("python -m pytest --doctest-modules -vv -rs README.rst")
 
 
+@task
+def benchmark(c, output=None, compare=None, threshold=0.25):
+    command = "python benchmarks/run.py --threshold {}".format(threshold)
+    if output:
+        command += " --output {}".format(output)
+    if compare:
+        command += " --compare {}".format(compare)
+    c.run(command)
+
+
 @task
 def docs(c):
     c.run("sphinx-build -M html ./docs/source ./docs/build")
@@ -0,0 +1,182 @@
+# type: ignore
+
+import collections
+import sys
+
+import pytest
+
+import tippo
+
+T = tippo.TypeVar("T", bound=int)
+C = tippo.TypeVar("C", int, str)
+
+
+class Node(object):
+    pass
+
+
+class Foo(object):
+    def foo(self):
+        pass
+
+
+class FooProtocol(tippo.Protocol):
+    def foo(self):
+        pass
+
+
+def test_plain():
+    assert tippo.is_instance(1, int)
+    assert tippo.is_instance(True, int)
+    assert not tippo.is_instance("a", int)
+    assert tippo.is_instance(None, None)
+    assert tippo.is_instance(None, type(None))
+    assert tippo.is_instance(object(), object)
+    assert tippo.is_instance(object(), tippo.Any)
+    assert tippo.is_instance(1, tippo.ClassVar[int])
+    assert not tippo.is_instance(1, tippo.Final[str])
+    if hasattr(tippo, "Annotated"):
+        assert tippo.is_instance(1, tippo.Annotated[int, "meta"])
+
+
+def test_union():
+    assert tippo.is_instance(None, tippo.Optional[int])
+    assert not tippo.is_instance(1.0, tippo.Optional[int])
+    assert tippo.is_instance("a", tippo.Union[int, str])
+    assert tippo.is_instance([1], tippo.Union[str, tippo.List[int]])
+    assert not tippo.is_instance(["a"], tippo.Union[str, tippo.List[int]])
+    assert tippo.is_instance(object(), tippo.Union[int, tippo.Any])
+    if sys.version_info[:2] >= (3, 10):
+        assert tippo.is_instance(None, eval("int | None"))
+        assert not tippo.is_instance("a", eval("int | None"))
+
+
+def test_literal():
+    assert tippo.is_instance(1, tippo.Literal[1, "a"])
+    assert tippo.is_instance("a", tippo.Literal[1, "a"])
+    assert not tippo.is_instance(2, tippo.Literal[1, "a"])
+    assert not tippo.is_instance(True, tippo.Literal[1])
+    assert not tippo.is_instance([], tippo.Literal[1])
+
+
+def test_tuple():
+    assert tippo.is_instance((1, "a"), tippo.Tuple[int, str])
+    assert not tippo.is_instance((1, 1), tippo.Tuple[int, str])
+    assert not tippo.is_instance((1,), tippo.Tuple[int, str])
+    assert not tippo.is_instance([1, "a"], tippo.Tuple[int, str])
+    assert tippo.is_instance((), tippo.Tuple[()])
+    assert not tippo.is_instance((1,), tippo.Tuple[()])
+    assert tippo.is_instance((1, 2, 3), tippo.Tuple[int, ...])
+    assert not tippo.is_instance((1, "a"), tippo.Tuple[int, ...])
+    assert tippo.is_instance((1, "a"), tippo.Tuple)
+
+
+def test_collections():
+    assert tippo.is_instance({"a": 1}, tippo.Dict[str, int])
+    assert not tippo.is_instance({"a": "b"}, tippo.Dict[str, int])
+    assert not tippo.is_instance([("a", 1)], tippo.Dict[str, int])
+    assert tippo.is_instance({"a": object()}, tippo.Mapping[str, tippo.Any])
+    assert tippo.is_instance(
+        collections.defaultdict(int, a=1), tippo.DefaultDict[str, int]
+    )
+    assert tippo.is_instance(collections.Counter("ab"), tippo.Counter[str])
+    assert tippo.is_instance([1, 2], tippo.List[int])
+    assert not tippo.is_instance([1, "a"], tippo.List[int])
+    assert tippo.is_instance([[1]], tippo.List[tippo.List[int]])
+    assert tippo.is_instance((1,), tippo.Sequence[int])
+    assert tippo.is_instance({1}, tippo.Set[int])
+    assert not tippo.is_instance(frozenset(["a"]), tippo.FrozenSet[int])
+    assert tippo.is_instance([1], tippo.List)
+    assert not tippo.is_instance((1,), tippo.List)
+
+    # Iterables are not consumed.
+    iterator = iter(["a"])
+    assert tippo.is_instance(iterator, tippo.Iterator[int])
+    assert next(iterator) == "a"
+
+
+def test_callable():
+    assert tippo.is_instance(len, tippo.Callable[[int], str])
+    assert tippo.is_instance(len, tippo.Callable)
+    assert not tippo.is_instance(1, tippo.Callable[..., tippo.Any])
+
+
+def test_type():
+    assert tippo.is_instance(bool, tippo.Type[int])
+    assert not tippo.is_instance(str, tippo.Type[int])
+    assert not tippo.is_instance(1, tippo.Type[int])
+    assert tippo.is_instance(str, tippo.Type[tippo.Union[int, str]])
+    assert tippo.is_instance(str, tippo.Type[tippo.Any])
+    assert tippo.is_instance(bool, tippo.Type[T])
+    assert not tippo.is_instance(float, tippo.Type[C])
+
+
+def test_typed_dict():
+    TD = tippo.TypedDict("TD", {"a": int, "b": tippo.List[str]})
+    assert tippo.is_instance({"a": 1, "b": ["x"]}, TD)
+    assert not tippo.is_instance({"a": 1}, TD)
+    assert not tippo.is_instance({"a": 1, "b": [1]}, TD)
+    assert not tippo.is_instance({"a": 1, "b": ["x"], "c": 1}, TD)
+
+    TDP = tippo.TypedDict("TDP", {"a": int}, total=False)
+    assert tippo.is_instance({}, TDP)
+    assert not tippo.is_instance({"a": "b"}, TDP)
+
+
+def test_new_type():
+    UserId = tippo.NewType("UserId", int)
+    assert tippo.is_instance(UserId(3), UserId)
+    assert not tippo.is_instance("3", UserId)
+
+
+def test_protocol():
+    assert tippo.is_instance(Foo(), FooProtocol)
+    assert not tippo.is_instance(object(), FooProtocol)
+    assert tippo.is_instance({}, tippo.SupportsKeysAndGetItem[str, int])
+    assert not tippo.is_instance([], tippo.SupportsKeysAndGetItem[str, int])
+    assert tippo.is_instance([], tippo.SupportsGetItem[int, int])
+
+
+def test_type_var():
+    assert tippo.is_instance(1, T)
+    assert not tippo.is_instance("a", T)
+    assert tippo.is_instance("a", C)
+    assert not tippo.is_instance(1.0, C)
+    assert tippo.is_instance(object(), tippo.TypeVar("U"))
+
+
+def test_forward_ref():
+    checker = tippo.compile_checker("Node", globals())
+    assert checker(Node())
+    assert not checker(1)
+    assert tippo.compile_checker(tippo.List["Node"], globals())([Node()])
+
+    # Forward references are resolved on the first check.
+    checker = tippo.compile_checker("Missing", globals())
+    with pytest.raises(NameError):
+        checker(1)
+    with pytest.raises(NameError):
+        tippo.is_instance(1, "Node")
+
+
+def test_unsupported():
+    with pytest.raises(TypeError):
+        tippo.compile_checker(1)
+    with pytest.raises(TypeError):
+        tippo.compile_checker(tippo.Type[tippo.List[int]])
+
+
+def test_cache():
+    annotation = tippo.Dict[str, tippo.List[int]]
+    checker = tippo.compile_checker(annotation)
+    assert tippo.compile_checker(annotation) is checker
+    assert tippo.compile_checker(int) is tippo.compile_checker(int)
+
+    # Checkers compiled with namespaces are not cached.
+    assert tippo.compile_checker("Node", globals()) is not tippo.compile_checker(
+        "Node", globals()
+    )
+
+
+if __name__ == "__main__":
+    pytest.main()
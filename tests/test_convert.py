@@ -0,0 +1,88 @@
+# type: ignore
+
+import collections
+import sys
+
+import pytest
+from six.moves import collections_abc
+
+import tippo
+from tippo._convert import PEP_585
+
+T = tippo.TypeVar("T")
+
+
+def test_shallow():
+    assert tippo.get_builtin(tippo.List) is list
+    assert tippo.get_builtin(tippo.Set) is set
+    assert tippo.get_builtin(tippo.AbstractSet) is collections_abc.Set
+    assert tippo.get_builtin(tippo.FrozenSet) is frozenset
+    assert tippo.get_builtin(tippo.DefaultDict) is collections.defaultdict
+    assert tippo.get_builtin(int) is int
+    assert tippo.get_typing(set) is tippo.Set
+    assert tippo.get_typing(collections_abc.Set) is tippo.AbstractSet
+    assert tippo.get_typing(collections.deque) is tippo.Deque
+    assert tippo.get_typing(int) is int
+
+
+def test_deep():
+    expressions = [
+        tippo.List[tippo.Dict[str, int]],
+        tippo.Optional[tippo.List[int]],
+        tippo.Tuple[int, ...],
+        tippo.Tuple[()],
+        tippo.Tuple[int, tippo.Set[str]],
+        tippo.Callable[[tippo.List[int]], tippo.FrozenSet[str]],
+        tippo.Callable[..., tippo.Mapping[str, int]],
+        tippo.Literal[1, "a"],
+        tippo.Type[tippo.List[int]],
+        tippo.ClassVar[tippo.List[int]],
+        tippo.Sequence[tippo.AbstractSet[int]],
+        tippo.DefaultDict[str, tippo.List[T]],
+        tippo.List,
+        tippo.Tuple,
+        int,
+    ]
+    if hasattr(tippo, "Annotated"):
+        expressions.append(tippo.Annotated[tippo.List[int], "meta"])
+    for expression in expressions:
+        builtin = tippo.get_builtin(expression, deep=True)
+        typing_ = tippo.get_typing(expression, deep=True)
+        assert typing_ == expression
+        assert tippo.get_typing(builtin, deep=True) is typing_
+        assert tippo.get_builtin(typing_, deep=True) is builtin
+
+    builtin = tippo.get_builtin(tippo.Dict[str, tippo.List[int]], deep=True)
+    if PEP_585:
+        assert builtin == eval("dict[str, list[int]]")
+        assert (
+            tippo.get_typing(eval("dict[str, list[int]]"), deep=True)
+            == tippo.Dict[str, tippo.List[int]]
+        )
+    else:
+        assert builtin == tippo.Dict[str, tippo.List[int]]
+
+    if sys.version_info[:2] >= (3, 10):
+        assert tippo.get_typing(eval("list[int] | None"), deep=True) == (
+            tippo.Optional[tippo.List[int]]
+        )
+
+
+def test_interned():
+    a = tippo.get_typing(tippo.List[tippo.Dict[str, int]], deep=True)
+    b = tippo.get_typing(
+        tippo.get_builtin(tippo.List[tippo.Dict[str, int]], deep=True), deep=True
+    )
+    assert a is b
+    assert tippo.get_args(a)[0] is tippo.get_typing(tippo.Dict[str, int], deep=True)
+
+    # Literal values are compared along with their types (some versions of typing
+    # already return the same object for both).
+    if tippo.Literal[1] is not tippo.Literal[True]:
+        assert tippo.get_typing(tippo.Literal[1], deep=True) is not (
+            tippo.get_typing(tippo.Literal[True], deep=True)
+        )
+
+
+if __name__ == "__main__":
+    pytest.main()
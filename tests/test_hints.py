@@ -0,0 +1,112 @@
+# type: ignore
+
+import gc
+import sys
+import weakref
+
+import pytest
+
+import tippo
+
+
+class Base(object):
+    __annotations__ = {"a": "int", "b": "tippo.Optional[Base]", "c": None}
+
+
+class Sub(Base):
+    Inner = str
+    __annotations__ = {"a": "str", "d": tippo.List["Sub"], "e": "Inner"}
+
+
+class Other(object):
+    __annotations__ = {"a": "int", "f": "Missing"}
+
+
+def function(a, b=None):
+    pass
+
+
+function.__annotations__ = {"a": "int", "b": "Sub", "return": None}
+
+
+def test_get_type_hints_cached():
+    assert tippo.get_type_hints_cached(Base) == {
+        "a": int,
+        "b": tippo.Optional[Base],
+        "c": type(None),
+    }
+    assert tippo.get_type_hints_cached(Sub) == {
+        "a": str,
+        "b": tippo.Optional[Base],
+        "c": type(None),
+        "d": tippo.List[Sub],
+        "e": str,
+    }
+    if tippo.get_type_hints(function) is not None:
+        assert tippo.get_type_hints_cached(function) == tippo.get_type_hints(function)
+    else:
+        assert tippo.get_type_hints_cached(function) == {}
+
+    if sys.version_info[:2] >= (3, 9):
+        Extras = type(
+            "Extras",
+            (object,),
+            {"__annotations__": {"a": "tippo.Annotated[int, 'meta']"}},
+        )
+        assert tippo.get_type_hints_cached(Extras) == {
+            "a": tippo.Annotated[int, "meta"]
+        }
+
+    with pytest.raises(NameError):
+        tippo.get_type_hints_cached(Other)
+
+
+def test_cache():
+    tippo.get_type_hints_cached.cache_clear()
+    hints = tippo.get_type_hints_cached(Sub)
+    assert tippo.get_type_hints_cached.cache_info().misses == 1
+
+    # Results are copies.
+    hints["x"] = int
+    assert "x" not in tippo.get_type_hints_cached(Sub)
+    assert tippo.get_type_hints_cached.cache_info().hits == 1
+
+    # Base classes were resolved along with the subclass.
+    assert tippo.get_type_hints_cached(Base)["b"] == tippo.Optional[Base]
+
+    # Annotations resolved in the module's namespace are shared.
+    module_cache = tippo._hints._MODULES[__name__]
+    assert module_cache.annotations["int"] is int
+    assert "Inner" not in module_cache.annotations
+
+    # Classes are held weakly.
+    class Temp(object):
+        __annotations__ = {"a": "int"}
+
+    assert tippo.get_type_hints_cached(Temp) == {"a": int}
+    temp_ref = weakref.ref(Temp)
+    del Temp
+    gc.collect()
+    assert temp_ref() is None
+
+
+def test_invalidate():
+    assert tippo.get_type_hints_cached(Sub)["d"] == tippo.List[Sub]
+    original = Sub.__annotations__
+    try:
+        Sub.__annotations__ = {"a": "str", "d": tippo.List["Base"], "e": "Inner"}
+        assert tippo.get_type_hints_cached(Sub)["d"] == tippo.List[Sub]
+        tippo.get_type_hints_cached.invalidate(Sub)
+        assert __name__ not in tippo._hints._MODULES
+        assert tippo.get_type_hints_cached(Sub)["d"] == tippo.List[Base]
+    finally:
+        Sub.__annotations__ = original
+        tippo.get_type_hints_cached.invalidate(__name__)
+    assert tippo.get_type_hints_cached(Sub)["d"] == tippo.List[Sub]
+
+    tippo.get_type_hints_cached.invalidate()
+    assert tippo.get_type_hints_cached.cache_info().currsize == 0
+
+
+if __name__ == "__main__":
+    pytest.main()
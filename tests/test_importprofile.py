@@ -0,0 +1,32 @@
+# type: ignore
+
+import json
+
+import pytest
+
+from tippo import importprofile
+
+
+def test_profile():
+    results = importprofile.profile(repeat=2, snapshot=False)
+    phases = [p["phase"] for p in results["phases"]]
+    assert phases[0] == "import typing"
+    assert "imports" in phases
+    assert "mappings" in phases
+    assert phases[-1] == "module"
+    assert all(p["time"] >= 0 for p in results["phases"])
+    assert results["total"]["time"] == pytest.approx(
+        sum(p["time"] for p in results["phases"])
+    )
+    json.dumps(results)
+
+
+def test_main(capsys):
+    assert importprofile.main(["--repeat", "1", "--no-tracemalloc"]) == 0
+    assert "mappings" in capsys.readouterr().out
+    assert importprofile.main(["--repeat", "1", "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["repeat"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main()
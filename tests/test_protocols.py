@@ -0,0 +1,121 @@
+# type: ignore
+
+import gc
+import weakref
+
+import pytest
+
+import tippo
+from tippo import _protocols
+
+
+class Named(tippo.Protocol):
+    name = None  # type: str
+
+    def greet(self):
+        pass
+
+
+class HasValue(tippo.Protocol):
+    pass
+
+
+# Python 2.7 compatible annotation.
+HasValue.__annotations__ = {"value": int}
+
+
+class SupportsHash(tippo.Protocol):
+    def __hash__(self):
+        pass
+
+
+class Greeter(object):
+    name = "greeter"
+
+    def greet(self):
+        pass
+
+
+class Unhashable(object):
+    def __getitem__(self, item):
+        return item
+
+    __hash__ = None
+
+
+def test_members():
+    assert _protocols.get_members(tippo.SupportsGetItem) == (
+        frozenset(["__getitem__"]),
+        frozenset(),
+    )
+    assert _protocols.get_members(tippo.SupportsGetSetDeleteItem)[0] == frozenset(
+        ["__getitem__", "__setitem__", "__delitem__"]
+    )
+    assert _protocols.get_members(tippo.SupportsKeysAndGetItem)[0] == frozenset(
+        ["keys", "__getitem__"]
+    )
+    assert _protocols.get_members(Named)[0] == frozenset(["name", "greet"])
+    assert _protocols.get_members(HasValue) == (frozenset(), frozenset(["value"]))
+
+
+def test_is_protocol():
+    assert _protocols.is_protocol(tippo.SupportsGetItem)
+    assert _protocols.is_protocol(tippo.SupportsGetSetItem)
+    assert _protocols.is_protocol(tippo.SupportsGetSetDeleteItem)
+    assert not _protocols.is_protocol(tippo.Protocol)
+    assert not _protocols.is_protocol(Greeter)
+
+
+def test_supports():
+    assert tippo.supports({}, tippo.SupportsKeysAndGetItem)
+    assert tippo.supports({}, tippo.SupportsKeysAndGetItem[str, int])
+    assert not tippo.supports([], tippo.SupportsKeysAndGetItem)
+    assert tippo.supports([], tippo.SupportsGetSetDeleteItem)
+    assert not tippo.supports((), tippo.SupportsGetSetItem)
+    assert tippo.supports(Greeter(), Named)
+    assert not tippo.supports(object(), Named)
+    assert tippo.supports(Unhashable(), tippo.SupportsGetItem)
+
+    # Members set to None are not supported.
+    assert tippo.supports(Greeter(), SupportsHash)
+    assert not tippo.supports(Unhashable(), SupportsHash)
+
+    # Members declared as annotations only are looked up on instances.
+    obj = Greeter()
+    assert not tippo.supports(obj, HasValue)
+    obj.value = 3
+    assert tippo.supports(obj, HasValue)
+
+    with pytest.raises(TypeError):
+        tippo.supports(1, int)
+    with pytest.raises(TypeError):
+        tippo.supports(1, tippo.Protocol)
+
+
+def test_cache():
+    checker = _protocols.get_checker(tippo.SupportsGetItem)
+    assert _protocols.get_checker(tippo.SupportsGetItem) is checker
+
+    class Foo(object):
+        def __getitem__(self, item):
+            return item
+
+    assert tippo.supports(Foo(), tippo.SupportsGetItem)
+    assert tippo.supports(Foo(), tippo.SupportsGetItem)
+
+    # Classes are not kept alive by their verdicts.
+    foo_ref = weakref.ref(Foo)
+    del Foo
+    gc.collect()
+    assert foo_ref() is None
+
+
+def test_checker():
+    assert tippo.is_instance({}, tippo.SupportsKeysAndGetItem[str, int])
+    assert tippo.is_instance([], tippo.SupportsGetSetItem[int, int])
+    assert not tippo.is_instance((), tippo.SupportsGetSetItem[int, int])
+    assert tippo.is_instance(Greeter(), tippo.Optional[Named])
+
+
+if __name__ == "__main__":
+    pytest.main()
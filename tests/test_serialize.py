@@ -0,0 +1,117 @@
+# type: ignore
+
+import sys
+
+import pytest
+
+import tippo
+
+T = tippo.TypeVar("T")
+T_co = tippo.TypeVar("T_co", covariant=True)
+
+
+class Box(tippo.Generic[T]):
+    pass
+
+
+EXPRESSIONS = [
+    (int, "int"),
+    (tippo.List[int], "List[int]"),
+    (
+        tippo.Dict[str, tippo.List[tippo.Optional[int]]],
+        "Dict[str,List[Union[int,None]]]",
+    ),
+    (tippo.Union[int, str, None], "Union[int,str,None]"),
+    (tippo.Literal[1, "a", True, None], 'Literal[1,"a",True,None]'),
+    (tippo.List["Foo"], 'List["Foo"]'),
+    (tippo.Tuple[()], "Tuple[()]"),
+    (tippo.Tuple[int, ...], "Tuple[int,...]"),
+    (tippo.Tuple, "Tuple"),
+    (tippo.Callable[[int, str], bool], "Callable[[int,str],bool]"),
+    (tippo.Callable[..., None], "Callable[...,None]"),
+    (tippo.Type[Box[int]], "Type[{}:Box[int]]".format(__name__)),
+    (tippo.Mapping[str, tippo.Any], "Mapping[str,Any]"),
+    (tippo.ClassVar[tippo.FrozenSet[int]], "ClassVar[FrozenSet[int]]"),
+]
+
+
+@pytest.mark.parametrize("typ, data", EXPRESSIONS)
+def test_round_trip(typ, data):
+    assert tippo.dumps_type(typ) == data
+    assert tippo.loads_type(data) == typ
+    assert tippo.loads_type(tippo.dumps_type(typ, binary=True)) is (
+        tippo.loads_type(data)
+    )
+
+
+def test_type_vars():
+    U = tippo.TypeVar("U", bound=int)
+    V = tippo.TypeVar("V", int, str)
+    W = tippo.TypeVar("W", contravariant=True)
+    P = tippo.ParamSpec("P")
+    assert tippo.dumps_type(U) == "~U<int>"
+    assert tippo.dumps_type(V) == "~V(int,str)"
+    assert tippo.dumps_type(W) == "~-W"
+    assert tippo.dumps_type(P) == "~**P"
+
+    # Type variables without a module reference are recreated once per definition.
+    loaded = tippo.loads_type("~U<int>")
+    assert loaded is not U
+    assert loaded.__name__ == "U" and loaded.__bound__ is int
+    assert tippo.loads_type("List[~U<int>]") == tippo.List[loaded]
+    assert tippo.loads_type("~V(int,str)").__constraints__ == (int, str)
+    assert tippo.loads_type("~-W").__contravariant__
+    assert isinstance(tippo.loads_type("~**P"), type(P))
+
+    # Module-level type variables are referenced by their module.
+    if sys.version_info[0] > 2:
+        assert tippo.dumps_type(T_co) == "~{}:T_co".format(__name__)
+        assert tippo.loads_type(tippo.dumps_type(tippo.Dict[T, T_co])) == (
+            tippo.Dict[T, T_co]
+        )
+
+
+def test_literal_values():
+    data = tippo.dumps_type(tippo.Literal[-3, b"\xff", "\xe9"])
+    loaded = tippo.loads_type(data)
+    assert tippo.get_args(loaded) == (-3, b"\xff", "\xe9")
+    if sys.version_info[0] > 2:
+        import enum
+
+        Color = enum.Enum("Color", "RED GREEN", module=__name__)
+        globals()["Color"] = Color
+        data = tippo.dumps_type(tippo.Literal[Color.RED])
+        assert data == "Literal[{}:Color.RED]".format(__name__)
+        assert tippo.loads_type(data) == tippo.Literal[Color.RED]
+
+
+def test_errors():
+    class Local(object):
+        pass
+
+    with pytest.raises(TypeError):
+        tippo.dumps_type(Local)
+    with pytest.raises(TypeError):
+        tippo.dumps_type(tippo.Literal[1.5])
+    with pytest.raises(ValueError):
+        tippo.loads_type("List[int")
+    with pytest.raises(ValueError):
+        tippo.loads_type("List[int]]")
+    with pytest.raises(ValueError):
+        tippo.loads_type(b"List[int]" if sys.version_info[0] > 2 else 3)
+    with pytest.raises(ImportError):
+        tippo.loads_type("tippo_missing_module:Foo")
+    with pytest.raises(AttributeError):
+        tippo.loads_type("tippo:MissingMember")
+
+
+def test_cache():
+    tippo.loads_type.cache_clear()
+    first = tippo.loads_type("Dict[str,List[int]]")
+    assert tippo.loads_type("Dict[str,List[int]]") is first
+    info = tippo.loads_type.cache_info()
+    assert info.hits == 1 and info.misses == 1
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,145 @@
+# type: ignore
+
+import pytest
+
+import tippo
+
+T = tippo.TypeVar("T")
+T_co = tippo.TypeVar("T_co", covariant=True)
+T_contra = tippo.TypeVar("T_contra", contravariant=True)
+IntT = tippo.TypeVar("IntT", bound=int)
+UserId = tippo.NewType("UserId", int)
+
+
+class Box(tippo.Generic[T_co]):
+    pass
+
+
+class IntBox(Box[int]):
+    pass
+
+
+class Sink(tippo.Generic[T_contra]):
+    pass
+
+
+class Cell(tippo.Generic[T]):
+    pass
+
+
+class SupportsName(tippo.Protocol):
+    def name(self):
+        pass
+
+
+class Named(object):
+    def name(self):
+        return "named"
+
+
+Movie = tippo.TypedDict("Movie", {"title": str, "year": int})
+Film = tippo.TypedDict("Film", {"title": str, "year": int, "director": str})
+Draft = tippo.TypedDict("Draft", {"title": str, "year": int}, total=False)
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [
+        (int, int, True),
+        (bool, int, True),
+        (int, bool, False),
+        (int, float, True),
+        (int, complex, True),
+        (float, int, False),
+        (int, tippo.Any, True),
+        (tippo.Any, int, True),
+        (int, object, True),
+        (object, int, False),
+        (None, tippo.Optional[int], True),
+        (tippo.NoReturn, int, True),
+        (tippo.List[int], tippo.Sequence[int], True),
+        (tippo.List[bool], tippo.Sequence[int], True),
+        (tippo.List[bool], tippo.List[int], False),
+        (tippo.List, tippo.Sequence[int], True),
+        (tippo.Set[int], tippo.Sized, True),
+        (tippo.FrozenSet[bool], tippo.AbstractSet[int], True),
+        (str, tippo.Sequence[str], True),
+        (tippo.Dict[str, bool], tippo.Mapping[str, int], True),
+        (tippo.Dict[str, int], tippo.Mapping[object, int], False),
+        (tippo.DefaultDict[str, int], tippo.Dict[str, int], True),
+        (tippo.Counter[str], tippo.Mapping[str, int], True),
+        (tippo.Counter[str], tippo.Mapping[str, str], False),
+        (tippo.Optional[int], tippo.Union[int, None, str], True),
+        (tippo.Union[int, None, str], tippo.Optional[int], False),
+        (tippo.Union[bool, int], int, True),
+        (tippo.Literal[1, 2], int, True),
+        (tippo.Literal[1, "a"], int, False),
+        (tippo.Literal[1], tippo.Literal[1, 2], True),
+        (tippo.Literal[3], tippo.Literal[1, 2], False),
+        (int, tippo.Literal[1], False),
+        (tippo.Tuple[int, str], tippo.Tuple[object, ...], True),
+        (tippo.Tuple[int, str], tippo.Tuple[int, str], True),
+        (tippo.Tuple[int, str], tippo.Tuple[int], False),
+        (tippo.Tuple[int, ...], tippo.Tuple[int, int], False),
+        (tippo.Tuple[int, str], tippo.Sequence[object], True),
+        (tippo.Tuple[int, str], tippo.Sequence[int], False),
+        (tippo.Callable[[object], int], tippo.Callable[[int], object], True),
+        (tippo.Callable[[int], int], tippo.Callable[[object], int], False),
+        (tippo.Callable[[int], str], tippo.Callable[[int], int], False),
+        (tippo.Callable[..., int], tippo.Callable[[int], int], True),
+        (tippo.Type[bool], tippo.Type[int], True),
+        (tippo.Type[int], tippo.Type[bool], False),
+        (tippo.Iterator[bool], tippo.Iterable[int], True),
+        (IntT, int, True),
+        (IntT, str, False),
+        (UserId, int, True),
+        (int, UserId, False),
+        (Box[bool], Box[int], True),
+        (Box[int], Box[bool], False),
+        (Sink[int], Sink[bool], True),
+        (Sink[bool], Sink[int], False),
+        (Cell[bool], Cell[int], False),
+        (IntBox, Box[int], True),
+        (IntBox, Box[str], False),
+        (Named, SupportsName, True),
+        (int, SupportsName, False),
+        (Film, Movie, True),
+        (Movie, Film, False),
+        (Draft, Movie, False),
+        (Movie, tippo.Mapping[str, object], True),
+    ],
+)
+def test_is_subtype(a, b, expected):
+    assert tippo.is_subtype(a, b) is expected
+
+
+def test_param_spec_variance():
+    P = tippo.ParamSpec("P")
+    assert tippo.is_subtype(P, tippo.Any)
+    covariant = tippo.ParamSpec("covariant", covariant=True)
+    assert covariant.__covariant__ and not covariant.__contravariant__
+
+
+def test_forward_ref():
+    assert tippo.is_subtype("Foo", "Foo")
+    with pytest.raises(TypeError):
+        tippo.is_subtype("Foo", int)
+
+
+def test_memo():
+    tippo.is_subtype.cache_clear()
+    assert tippo.is_subtype(tippo.List[bool], tippo.Sequence[int])
+    misses = tippo.is_subtype.cache_info().misses
+    assert tippo.is_subtype(tippo.List[bool], tippo.Sequence[int])
+    assert tippo.is_subtype.cache_info().misses == misses
+    assert tippo.is_subtype.cache_info().hits >= 1
+
+    # Equivalent spellings share memo entries.
+    info = tippo.is_subtype.cache_info()
+    builtin = tippo.get_builtin(tippo.List[bool], deep=True)
+    assert tippo.is_subtype(builtin, tippo.Sequence[int])
+    assert tippo.is_subtype.cache_info().hits == info.hits + 1
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -1,5 +1,10 @@
 # type: ignore
 
+import copy
+import gc
+import multiprocessing
+import pickle
+import threading
 import typing
 
 import pytest
@@ -10,6 +15,7 @@ from six.moves import collections_abc
 import tippo
 
 T = tippo.TypeVar("T")
+P = tippo.ParamSpec("P")
 
 
 def test_all():
@@ -37,6 +43,47 @@ def test_all():
     assert "get_name" in tippo._all_
 
 
+def test_lazy():
+    namespace = vars(tippo)
+    namespace.pop("NamedTuple", None)
+    assert "NamedTuple" not in namespace
+    assert "NamedTuple" in dir(tippo)
+    assert tippo.NamedTuple is typing.NamedTuple
+    assert "NamedTuple" in namespace
+
+    from tippo import Text
+
+    assert Text is typing.Text
+
+    with pytest.raises(AttributeError):
+        getattr(tippo, "NotATippoMember")
+
+
+def test_snapshot(tmpdir, monkeypatch):
+    from tippo import _snapshot
+
+    monkeypatch.delenv("TIPPO_NO_SNAPSHOT", raising=False)
+    values = tippo._SNAPSHOT_VALUES
+    assert tuple(tippo._all_) == values["all"]
+    if "need_ne_fix" in values:
+        assert values["need_ne_fix"] is tippo.need_ne_fix
+        assert values["need_weakref_fix"] is tippo.need_weakref_fix
+
+    path = str(tmpdir.join("_tippo_test_snapshot.py"))
+    assert _snapshot.dump(values, path) == path
+    monkeypatch.syspath_prepend(str(tmpdir))
+    assert _snapshot.load("_tippo_test_snapshot") == values
+
+    monkeypatch.setenv("TIPPO_NO_SNAPSHOT", "1")
+    assert _snapshot.load("_tippo_test_snapshot") is None
+    assert _snapshot.save(values) is None
+    monkeypatch.delenv("TIPPO_NO_SNAPSHOT")
+
+    monkeypatch.setattr(_snapshot, "fingerprint", lambda: ("stale",))
+    assert _snapshot.load("_tippo_test_snapshot") is None
+    assert _snapshot.load("_tippo_missing_snapshot") is None
+
+
 def test_missing():
     obj = object()
     for missing in ("TypeAlias", "ClassVar"):
@@ -50,6 +97,49 @@ def test_new_type():
         assert getattr(tippo, "NewType")("obj", obj) is obj
 
 
+def _get_param_spec_args(param_spec):
+    return param_spec.args
+
+
+def test_param_spec():
+    fallback = type(P).__module__ == "tippo"
+
+    # Pickling restores the same object (looked up by module).
+    assert pickle.loads(pickle.dumps(P)) is P
+    assert copy.deepcopy(P) is P
+    assert pickle.loads(pickle.dumps(P.args)) == P.args
+    assert pickle.loads(pickle.dumps(P.kwargs)) == P.kwargs
+
+    assert P.args != P.kwargs
+    assert not (P.args != P.args)
+
+    if fallback:
+        # Args and kwargs are hashable and interned.
+        assert hash(P.args) == hash(P.args)
+        assert len({P.args, P.args, P.kwargs}) == 2
+        assert P.args is P.args
+        assert P.kwargs is P.kwargs
+        assert repr(P.kwargs) == "P.kwargs"
+        assert tippo.get_name(P) == "P"
+
+        # Local ones are recreated (once) with the same definition.
+        Q = tippo.ParamSpec("Q", covariant=True)
+        restored = pickle.loads(pickle.dumps(Q))
+        assert restored is not Q
+        assert repr(restored) == "+Q"
+        assert pickle.loads(pickle.dumps(Q)) is restored
+
+        with pytest.raises(AttributeError):
+            P.foo = "bar"
+
+    pool = multiprocessing.Pool(1)
+    try:
+        assert pool.apply(_get_param_spec_args, (P,)) == P.args
+    finally:
+        pool.close()
+        pool.join()
+
+
 def test_generic_meta():
     # Metaclass uniformity.
     assert isinstance(tippo.Generic, tippo.GenericMeta)
@@ -115,6 +205,30 @@ def test_generic_meta():
     assert SubClass
 
 
+def test_generic_meta_weakref_threads():
+    class Class(tippo.Generic[T]):
+        __slots__ = ("__weakref__",)
+
+    results = []
+
+    def subscript():
+        for _ in range(50):
+            results.append(Class[int])
+            assert "__weakref__" in Class.__slots__
+
+    threads = [threading.Thread(target=subscript) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 400
+    assert all(r == results[0] for r in results)
+    if getattr(tippo, "need_weakref_fix", False):
+        assert all(r is results[0] for r in results)
+    assert Class.__slots__ == ("__weakref__",)
+
+
 def test_get_origin():
     assert tippo.get_origin(tippo.Literal[42]) is tippo.Literal
     assert tippo.get_origin(int) is None
@@ -205,6 +319,32 @@ def test_get_args():
     assert tippo.get_args(tippo.Callable[Ellipsis, T]) == (Ellipsis, T)
 
 
+def test_get_origin_args_cache():
+    if not hasattr(tippo.get_origin, "cache_info"):
+        pytest.skip("native get_origin/get_args")
+
+    tippo.get_origin.cache_clear()
+    tippo.get_args.cache_clear()
+
+    callable_type = tippo.Callable[[int, str], T]
+    assert tippo.get_origin(callable_type) is tippo.get_origin(callable_type)
+    assert tippo.get_origin.cache_info().hits == 1
+    assert tippo.get_origin.cache_info().currsize == 1
+
+    args = tippo.get_args(callable_type)
+    assert args == ([int, str], T)
+    args[0].append(float)
+    assert tippo.get_args(callable_type) == ([int, str], T)
+    assert tippo.get_args.cache_info().hits == 1
+
+    unhashable = [int]
+    assert tippo.get_origin(unhashable) is None
+    assert tippo.get_args(unhashable) == ()
+
+    tippo.get_origin.cache_clear()
+    assert tippo.get_origin.cache_info().currsize == 0
+
+
 def test_get_name():
     assert tippo.get_name(None) == "None"
     assert tippo.get_name(Ellipsis) == "..."
@@ -251,6 +391,64 @@ def test_get_name():
     assert tippo.get_name(tippo.List["Tuple"]) == "List"
 
     assert tippo.get_name(object()) is None
+    assert tippo.get_name(1) is None
+    assert tippo.get_name(0) is None
+    assert tippo.get_name(tippo.TypeVar("_T")) == "_T"
+
+
+def test_get_name_kinds():
+    class Foo(object):
+        pass
+
+    assert tippo._get_name_resolver(type) is tippo._get_plain_name
+    assert tippo._get_name_resolver(tippo.ForwardRef) is tippo._get_plain_name
+    assert tippo._get_name_resolver(type(T)) is tippo._get_plain_name
+    assert tippo._get_name_resolver(type(tippo.List[int])) in (
+        tippo._get_generic_name,
+        tippo._get_plain_name,
+    )
+
+    assert tippo._get_name(Foo, lambda t: "Custom") == "Custom"
+    assert tippo._get_name(Foo, lambda t: None) == "Foo"
+    assert tippo._NAME_RESOLVERS.get(type(Foo)) is tippo._get_plain_name
+
+
+def test_get_name_cache():
+    tippo.get_name.cache_clear()
+    assert tippo.get_name.cache_info().currsize == 0
+
+    class Foo(object):
+        pass
+
+    assert tippo.get_name(Foo) in ("test_get_name_cache.<locals>.Foo", "Foo")
+    assert tippo.get_name(Foo) is tippo.get_name(Foo)
+    assert tippo.get_name(tippo.List[int]) == "List"
+    assert tippo.get_name(tippo.List[int]) == "List"
+    info = tippo.get_name.cache_info()
+    assert info.hits >= 2
+    assert info.currsize >= 2
+
+    # Unhashable objects.
+    assert tippo.get_name([]) is None
+    assert tippo.get_name(tippo.get_args(tippo.Callable[[int], int])[0]) is None
+
+    # Equal objects with different names.
+    assert tippo.get_name(True) == "True"
+    assert tippo.get_name(1.5) is None
+
+    # Custom qualified name getter bypasses the cache.
+    info = tippo.get_name.cache_info()
+    assert tippo.get_name(Foo, lambda t: "Custom") == "Custom"
+    assert tippo.get_name.cache_info() == info
+
+    # Entries are discarded with their classes.
+    size = tippo.get_name.cache_info().currsize
+    del Foo
+    gc.collect()
+    assert tippo.get_name.cache_info().currsize == size - 1
+
+    tippo.get_name.cache_clear()
+    assert tippo.get_name.cache_info() == (0, 0, info.maxsize, 0)
 
 
 if __name__ == "__main__":
@@ -1,14 +1,139 @@
+import collections as _collections
+import contextlib as _contextlib
 import functools as _functools
+import importlib as _importlib
+import os as _os
+import sys as _sys
+import time as _time
+import types as _types
 import typing as _typing
+import weakref as _weakref
+from typing import TYPE_CHECKING
 from weakref import ref  # noqa
 
-import six as _six
 import typing_extensions as _typing_extensions
-from six.moves import collections_abc as _collections_abc
-from typing_extensions import *
 
-if True:
-    from typing import *  # type: ignore  # noqa
+from . import _cache, _snapshot
+
+try:
+    import collections.abc as _collections_abc
+except ImportError:
+    import collections as _collections_abc  # type: ignore  # noqa
+
+if TYPE_CHECKING:
+    from typing_extensions import *
+
+    if True:
+        from typing import *  # type: ignore  # noqa
+
+
+# Import phases, recorded only when profiling the import (see `tippo.importprofile`).
+_PHASES = []  # type: List[Tuple[str, float, int, int]]
+_PROFILE = bool(_os.environ.get("TIPPO_IMPORT_PROFILE"))
+_timer = getattr(_time, "perf_counter", _time.time)
+
+
+def _mark(phase):
+    # type: (str) -> None
+    """Mark the end of an import phase."""
+    if not _PROFILE:
+        return
+    timestamp = _timer()
+    current, peak = 0, -1
+    tracemalloc = _sys.modules.get("tracemalloc")
+    if tracemalloc is not None and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        else:
+            peak = -1
+    _PHASES.append((phase, timestamp, current, peak))
+
+
+_mark("imports")
+
+
+# Load the compatibility snapshot for this interpreter (if there's a fresh one), so
+# that the values below don't have to be probed on every import.
+_SNAPSHOT = _snapshot.load()  # type: Optional[Dict[str, Any]]
+_SNAPSHOT_VALUES = {}  # type: Dict[str, Any]
+_mark("snapshot load")
+
+
+def _probe(name, func):
+    # type: (str, Callable[[], _T]) -> _T
+    if _SNAPSHOT is not None and name in _SNAPSHOT:
+        value = cast(_T, _SNAPSHOT[name])
+    else:
+        value = func()
+    _SNAPSHOT_VALUES[name] = value
+    return value
+
+
+# Members are resolved lazily from typing (which takes precedence, like it would when
+# star-importing it last) or typing_extensions.
+_TYPING_MEMBERS = frozenset(str(m) for m in _typing.__all__)
+_TYPING_EXTENSIONS_MEMBERS = frozenset(str(m) for m in _typing_extensions.__all__)
+
+
+# Members implemented in submodules are imported on first access.
+_SUBMODULE_MEMBERS = {}  # type: Dict[str, str]
+
+
+def _resolve(name):
+    # type: (str) -> Any
+    module_name = _SUBMODULE_MEMBERS.get(name)
+    if module_name is not None:
+        return getattr(_importlib.import_module(module_name, __name__), name)
+    if name in _TYPING_MEMBERS:
+        return getattr(_typing, name)
+    if name in _TYPING_EXTENSIONS_MEMBERS:
+        return getattr(_typing_extensions, name)
+    error = "module {!r} has no attribute {!r}".format(__name__, name)
+    raise AttributeError(error)
+
+
+def _member(name):
+    # type: (str) -> Any
+    try:
+        return globals()[name]
+    except KeyError:
+        return _resolve(name)
+
+
+def _exists(name):
+    # type: (str) -> bool
+    return (
+        name in globals()
+        or name in _SUBMODULE_MEMBERS
+        or name in _TYPING_MEMBERS
+        or name in _TYPING_EXTENSIONS_MEMBERS
+    )
+
+
+# Members used by tippo itself are resolved eagerly (missing ones get added later).
+for _name in (
+    "Any",
+    "ClassVar",
+    "Dict",
+    "Final",
+    "Generic",
+    "List",
+    "Literal",
+    "Optional",
+    "Protocol",
+    "Self",
+    "Set",
+    "Tuple",
+    "Type",
+    "TypeVar",
+    "Union",
+    "cast",
+    "get_origin",
+):
+    if _exists(_name):
+        globals()[_name] = _resolve(_name)
+del _name
 
 
 _T = TypeVar("_T")
@@ -18,8 +143,14 @@ _KT = TypeVar("_KT")
 
 
 # Prepare __all__ by combining typing + typing_extensions.
-_all_ = sorted(str(m) for m in set(_typing.__all__ + _typing_extensions.__all__))
+_all_ = list(
+    _probe(
+        "all",
+        lambda: tuple(sorted(_TYPING_MEMBERS.union(_TYPING_EXTENSIONS_MEMBERS))),
+    )
+)
 globals()["__all__"] = _all_
+_mark("members")
 
 
 def _update_all(*_members):
@@ -27,6 +158,13 @@ def _update_all(*_members):
     _all_.extend(set(str(m) for m in _members).difference(_all_))
 
 
+def _update_submodule(module_name, *_members):
+    # type: (str, *str) -> None
+    for member in _members:
+        _SUBMODULE_MEMBERS[member] = module_name
+    _update_all(*_members)
+
+
 # Forward reference type.
 try:
     from typing import ForwardRef
@@ -47,38 +185,78 @@ _BUILTINS_MAPPING = {
 _BUILTINS_MAPPING.update(
     dict(
         (
-            getattr(_typing, n, getattr(_typing_extensions, n, None)),
+            # The abstract `Set` is `AbstractSet` in typing (`Set` is the builtin set).
+            getattr(
+                _typing,
+                "AbstractSet" if n == "Set" else n,
+                getattr(_typing_extensions, n, None),
+            ),
             getattr(_collections_abc, n),
         )
-        for n in set(getattr(_collections_abc, "__all__")).intersection(
-            _typing.__all__ + _typing_extensions.__all__
+        for n in _probe(
+            "builtins_mapping",
+            lambda: tuple(
+                sorted(
+                    n
+                    for n in set(getattr(_collections_abc, "__all__")).intersection(
+                        _typing.__all__ + _typing_extensions.__all__
+                    )
+                    if not n.startswith("_")
+                )
+            ),
         )
-        if not n.startswith("_")
     )
 )
+for _name, _builtin in (
+    ("FrozenSet", frozenset),
+    ("Deque", _collections.deque),
+    ("DefaultDict", _collections.defaultdict),
+    ("OrderedDict", getattr(_collections, "OrderedDict", None)),
+    ("Counter", _collections.Counter),
+    ("ChainMap", getattr(_collections, "ChainMap", None)),
+    ("ContextManager", getattr(_contextlib, "AbstractContextManager", None)),
+    ("AsyncContextManager", getattr(_contextlib, "AbstractAsyncContextManager", None)),
+):
+    if _exists(_name) and _builtin is not None:
+        _BUILTINS_MAPPING[_member(_name)] = _builtin
+del _name, _builtin
 assert None not in _BUILTINS_MAPPING
 _TYPING_MAPPING = dict((b, t) for t, b in _BUILTINS_MAPPING.items())
+_mark("mappings")
 
 
-def get_builtin(typ):
-    # type: (_T) -> _T
+def get_builtin(typ, deep=False):
+    # type: (_T, bool) -> _T
     """
     Get equivalent builtin.
 
     :param typ: Type.
+    :param deep: Whether to convert the type arguments recursively as well, producing
+        builtin generics where supported (PEP 585) and typing generics elsewhere.
+        Deep results are interned (structurally equal results are the same object).
     :return: Builtin type.
     """
+    if deep:
+        from ._convert import convert
+
+        return cast(_T, convert(typ, True))
     return cast(_T, _BUILTINS_MAPPING.get(typ, typ))
 
 
-def get_typing(typ):
-    # type: (_T) -> _T
+def get_typing(typ, deep=False):
+    # type: (_T, bool) -> _T
     """
     Get equivalent typing.
 
     :param typ: Type.
+    :param deep: Whether to convert the type arguments recursively as well. Deep
+        results are interned (structurally equal results are the same object).
     :return: Typing type.
     """
+    if deep:
+        from ._convert import convert
+
+        return cast(_T, convert(typ, False))
     return cast(_T, _TYPING_MAPPING.get(typ, typ))
 
 
@@ -91,12 +269,17 @@ try:
 except ImportError:
     GenericMeta = type
 else:
+    globals()["GenericMeta"] = _GenericMeta
 
-    class _Class(Generic[_T]):
-        pass
+    def _probe_ne_fix():
+        # type: () -> bool
+        class _Class(Generic[_T]):
+            pass
+
+        return (_Class[int] != _Class[(int,)]) is not False
 
     # Fix not equal operator logic in python 2.
-    need_ne_fix = (_Class[int] != _Class[(int,)]) is not False
+    need_ne_fix = _probe("need_ne_fix", _probe_ne_fix)
     if need_ne_fix:
 
         def __ne__(cls, other):
@@ -109,46 +292,75 @@ else:
 
         __ne__.__module__ = _GenericMeta.__module__
         type.__setattr__(_GenericMeta, "__ne__", __ne__)
+    _mark("probe: need_ne_fix")
 
-    # Fix subclassing slotted generic class with __weakref__.
-    class _SlottedClass(Generic[_T]):
-        __slots__ = ("__weakref__",)
+    def _probe_weakref_fix():
+        # type: () -> bool
+        class _SlottedClass(Generic[_T]):
+            __slots__ = ("__weakref__",)
 
-    try:
+        try:
 
-        class _SlottedSubClass(_SlottedClass[_T]):
-            __slots__ = ()
+            class _SlottedSubClass(_SlottedClass[_T]):
+                __slots__ = ()
 
-    except TypeError:
-        need_weakref_fix = True
-    else:
-        need_weakref_fix = False
+        except TypeError:
+            return True
+        else:
+            return False
 
+    # Fix subclassing slotted generic class with __weakref__.
+    need_weakref_fix = _probe("need_weakref_fix", _probe_weakref_fix)
     if need_weakref_fix:
+        import threading as _threading
+
         _original_getitem = getattr(_GenericMeta, "__getitem__")
+        _parametrizations = _cache.LRUCache(maxsize=1024)
+        _parametrizations_lock = _threading.RLock()
 
         @_functools.wraps(_original_getitem)
         def __getitem__(cls, params):
             # type: (Type[_T], Any) -> Type[_T]
             slots = getattr(cls, "__slots__", None)
-            if slots is not None and "__weakref__" in slots:
+            if slots is None or "__weakref__" not in slots:
+                return _original_getitem(cls, params)  # type: ignore
+
+            # Slotted classes with __weakref__ get parametrized only once.
+            key = (cls, params)  # type: Optional[Tuple[Type[_T], Any]]
+            try:
+                parametrized = _parametrizations.get(key)
+            except TypeError:  # unhashable parameters
+                key = None
+                parametrized = _cache.MISSING
+            if parametrized is not _cache.MISSING:
+                return parametrized  # type: ignore
+
+            # Temporarily remove __weakref__ from the slots while holding the lock, so
+            # other threads never see the class in that state.
+            with _parametrizations_lock:
+                if key is not None:
+                    parametrized = _parametrizations.get(key)
+                    if parametrized is not _cache.MISSING:
+                        return parametrized  # type: ignore
                 type.__setattr__(
                     cls, "__slots__", tuple(s for s in slots if s != "__weakref__")
                 )
                 try:
-                    return _original_getitem(cls, params)  # type: ignore
+                    parametrized = _original_getitem(cls, params)
                 finally:
                     type.__setattr__(cls, "__slots__", slots)
-            else:
-                return _original_getitem(cls, params)  # type: ignore
+                if key is not None:
+                    _parametrizations.set(key, parametrized)
+            return parametrized  # type: ignore
 
         type.__setattr__(_GenericMeta, "__getitem__", __getitem__)
+    _mark("probe: need_weakref_fix")
 
 _update_all("GenericMeta")
 
 
 # Add missing final decorator for older Python versions.
-if "final" not in globals():
+if not _exists("final"):
 
     def _final(f):  # type: ignore
         """A decorator to indicate final methods and final classes."""
@@ -158,6 +370,7 @@ if "final" not in globals():
     globals()["final"] = _final
 
     _update_all("final")
+    _mark("shim: final")
 
 
 class _MissingMeta(type):
@@ -167,7 +380,8 @@ class _MissingMeta(type):
 
 
 # Add missing TypeAlias for older Python versions.
-if "TypeAlias" not in globals():
+if not _exists("TypeAlias"):
+    import six as _six
 
     class _TypeAlias(_six.with_metaclass(_MissingMeta, object)):
         pass
@@ -176,10 +390,12 @@ if "TypeAlias" not in globals():
     globals()["TypeAlias"] = _TypeAlias
 
     _update_all("TypeAlias")
+    _mark("shim: TypeAlias")
 
 
 # Add missing ClassVar for older Python versions.
-if "ClassVar" not in globals():
+if not _exists("ClassVar"):
+    import six as _six
 
     class _ClassVar(_six.with_metaclass(_MissingMeta, object)):
         pass
@@ -188,10 +404,11 @@ if "ClassVar" not in globals():
     globals()["ClassVar"] = _ClassVar
 
     _update_all("ClassVar")
+    _mark("shim: ClassVar")
 
 
 # Add missing NewType for older Python versions.
-if "NewType" not in globals():
+if not _exists("NewType"):
 
     def _NewType(_name, _typ):  # type: ignore
         return _typ
@@ -200,10 +417,12 @@ if "NewType" not in globals():
     globals()["NewType"] = _NewType
 
     _update_all("NewType")
+    _mark("shim: NewType")
 
 
 # Add missing Unpack for older Python versions.
-if "Unpack" not in globals():
+if not _exists("Unpack"):
+    import six as _six
 
     class _Unpack(_six.with_metaclass(_MissingMeta, object)):
         pass
@@ -212,10 +431,12 @@ if "Unpack" not in globals():
     globals()["Unpack"] = _Unpack
 
     _update_all("Unpack")
+    _mark("shim: Unpack")
 
 
 # Add missing IO for older Python versions.
-if "IO" not in globals():
+if not _exists("IO"):
+    import six as _six
 
     class _IO(_six.with_metaclass(_MissingMeta, object)):
         pass
@@ -224,10 +445,11 @@ if "IO" not in globals():
     globals()["IO"] = _IO
 
     _update_all("IO")
+    _mark("shim: IO")
 
 
 # Add missing TextIO type for older Python versions.
-if "TextIO" not in globals():
+if not _exists("TextIO"):
 
     def _TextIO():  # type: ignore
         error = "can't instantiate tippo.TextIO"
@@ -237,10 +459,11 @@ if "TextIO" not in globals():
     globals()["TextIO"] = _TextIO
 
     _update_all("TextIO")
+    _mark("shim: TextIO")
 
 
 # Add missing BinaryIO type for older Python versions.
-if "BinaryIO" not in globals():
+if not _exists("BinaryIO"):
 
     def _BinaryIO():  # type: ignore
         error = "can't instantiate tippo.BinaryIO"
@@ -250,10 +473,11 @@ if "BinaryIO" not in globals():
     globals()["BinaryIO"] = _BinaryIO
 
     _update_all("BinaryIO")
+    _mark("shim: BinaryIO")
 
 
 # Add missing Self type for older Python versions.
-if "Self" not in globals():
+if not _exists("Self"):
 
     def _Self():  # type: ignore
         error = "can't instantiate tippo.Self"
@@ -263,10 +487,11 @@ if "Self" not in globals():
     globals()["Self"] = _Self
 
     _update_all("Self")
+    _mark("shim: Self")
 
 
 # Add missing NoReturn type for older Python versions.
-if "NoReturn" not in globals():
+if not _exists("NoReturn"):
 
     def _NoReturn():  # type: ignore
         error = "can't instantiate tippo.NoReturn"
@@ -276,10 +501,11 @@ if "NoReturn" not in globals():
     globals()["NoReturn"] = _NoReturn
 
     _update_all("NoReturn")
+    _mark("shim: NoReturn")
 
 
 # Add missing override decorator for older Python versions.
-if "override" not in globals():
+if not _exists("override"):
 
     def _override(func):  # type: ignore
         return func
@@ -288,14 +514,26 @@ if "override" not in globals():
     globals()["override"] = _override
 
     _update_all("override")
+    _mark("shim: override")
 
 
 # Add missing ParamSpec type var for older Python versions.
-if "ParamSpec" not in globals():
-    assert "ParamSpecArgs" not in globals()
-    assert "ParamSpecKwargs" not in globals()
+if not _exists("ParamSpec"):
+    assert not _exists("ParamSpecArgs")
+    assert not _exists("ParamSpecKwargs")
 
     class _ParamSpec(object):
+        __slots__ = (
+            "__name__",
+            "__covariant__",
+            "__contravariant__",
+            "__bound__",
+            "_module",
+            "_args",
+            "_kwargs",
+            "__weakref__",
+        )
+
         def __init__(self, name, bound=None, covariant=False, contravariant=False):
             # type: (str, Any, bool, bool) -> None
             TypeVar(  # noqa
@@ -309,6 +547,17 @@ if "ParamSpec" not in globals():
             self.__contravariant__ = bool(contravariant)
             self.__bound__ = bound
 
+            # Remember the module it was declared in (for pickling), like `TypeVar`.
+            try:
+                module = _sys._getframe(1).f_globals.get("__name__", "__main__")
+            except (AttributeError, ValueError):
+                module = None
+            self._module = module  # type: Optional[str]
+
+            # Interned `P.args` and `P.kwargs`.
+            self._args = _ParamSpecArgs(self)
+            self._kwargs = _ParamSpecKwargs(self)
+
         def __or__(self, right):
             # type: (object) -> Any
             return Union[self, right]
@@ -328,108 +577,228 @@ if "ParamSpec" not in globals():
             return prefix + self.__name__
 
         def __reduce__(self):
-            # type: () -> str
-            return self.__name__
+            # type: () -> Tuple[Any, ...]
+            return _restore_param_spec, (
+                self._module,
+                self.__name__,
+                self.__bound__,
+                self.__covariant__,
+                self.__contravariant__,
+            )
+
+        def __copy__(self):
+            # type: () -> _ParamSpec
+            return self
+
+        def __deepcopy__(self, memo):
+            # type: (Any) -> _ParamSpec
+            return self
 
         @property
         def args(self):
             # type: () -> _ParamSpecArgs
-            return _ParamSpecArgs(self)
+            return self._args
 
         @property
         def kwargs(self):
             # type: () -> _ParamSpecKwargs
-            return _ParamSpecKwargs(self)
+            return self._kwargs
 
-    _ParamSpec.__name__ = _ParamSpec.__qualname__ = "ParamSpec"
+    _ParamSpec.__name__ = "ParamSpec"
     globals()["ParamSpec"] = _ParamSpec
     _update_all("ParamSpec")
 
-    class _ParamSpecArgs(object):
+    # Parameter specifications restored from pickles (when they can't be found in
+    # their module) are interned per definition.
+    _restored_param_specs = (
+        _weakref.WeakValueDictionary()
+    )  # type: _weakref.WeakValueDictionary[Any, _ParamSpec]
+
+    def _restore_param_spec(module, name, bound, covariant, contravariant):
+        # type: (Optional[str], str, Any, bool, bool) -> _ParamSpec
+        param_spec = getattr(_sys.modules.get(module or ""), name, None)
+        if isinstance(param_spec, _ParamSpec):
+            return param_spec
+        key = (module, name, bound, covariant, contravariant)
+        try:
+            return _restored_param_specs[key]
+        except KeyError:
+            param_spec = _ParamSpec(
+                name, bound=bound, covariant=covariant, contravariant=contravariant
+            )
+            param_spec._module = module
+            return _restored_param_specs.setdefault(key, param_spec)
+        except TypeError:  # unhashable bound
+            return _ParamSpec(
+                name, bound=bound, covariant=covariant, contravariant=contravariant
+            )
+
+    class _ParamSpecComponent(object):
+        __slots__ = ("__origin__",)
+        _attribute = ""
+
         def __init__(self, origin):
             # type: (_ParamSpec) -> None
             self.__origin__ = origin
 
         def __repr__(self):
             # type: () -> str
-            return "{}.args".format(self.__origin__.__name__)
+            return "{}.{}".format(self.__origin__.__name__, self._attribute)
 
         def __eq__(self, other):
             # type: (object) -> bool
-            if not isinstance(other, _ParamSpecArgs):
+            if type(other) is not type(self):
                 return NotImplemented
             return self.__origin__ == other.__origin__
 
-    _ParamSpecArgs.__name__ = _ParamSpecArgs.__qualname__ = "ParamSpecArgs"
-    globals()["ParamSpecArgs"] = _ParamSpecArgs
-    _update_all("ParamSpecArgs")
+        def __ne__(self, other):
+            # type: (object) -> bool
+            is_equal = self.__eq__(other)
+            if is_equal is NotImplemented:
+                return NotImplemented
+            return not is_equal
 
-    class _ParamSpecKwargs(object):
-        def __init__(self, origin):
-            # type: (_ParamSpec) -> None
-            self.__origin__ = origin
+        def __hash__(self):
+            # type: () -> int
+            return hash((type(self), self.__origin__))
 
-        def __repr__(self):
-            # type: () -> str
-            return "{}.args".format(self.__origin__.__name__)
+        def __reduce__(self):
+            # type: () -> Tuple[Any, ...]
+            return getattr, (self.__origin__, self._attribute)
 
-        def __eq__(self, other):
-            # type: (object) -> bool
-            if not isinstance(other, _ParamSpecKwargs):
-                return NotImplemented
-            return self.__origin__ == other.__origin__
+    class _ParamSpecArgs(_ParamSpecComponent):
+        __slots__ = ()
+        _attribute = "args"
+
+    _ParamSpecArgs.__name__ = "ParamSpecArgs"
+    globals()["ParamSpecArgs"] = _ParamSpecArgs
+    _update_all("ParamSpecArgs")
+
+    class _ParamSpecKwargs(_ParamSpecComponent):
+        __slots__ = ()
+        _attribute = "kwargs"
 
-    _ParamSpecKwargs.__name__ = _ParamSpecKwargs.__qualname__ = "ParamSpecKwargs"
+    _ParamSpecKwargs.__name__ = "ParamSpecKwargs"
     globals()["ParamSpecKwargs"] = _ParamSpecKwargs
     _update_all("ParamSpecKwargs")
 
+    # Set qualified names only where classes have them, so they don't shadow the
+    # names of the instances.
+    if hasattr(type, "__qualname__"):
+        for _cls in (_ParamSpec, _ParamSpecArgs, _ParamSpecKwargs):
+            _cls.__qualname__ = _cls.__name__
+        del _cls
+    _mark("shim: ParamSpec")
+
 
 # Add missing get_origin function for older Python versions.
-if "get_origin" not in globals():
-    from typing_inspect import get_origin as _typing_inspect_get_origin  # type: ignore
+if not _exists("get_origin"):
+
+    def _typing_inspect_get_origin(typ):
+        # type: (Any) -> Any
+        from typing_inspect import get_origin  # type: ignore
+
+        # Import typing_inspect on first use only, then replace this function.
+        globals()["_typing_inspect_get_origin"] = get_origin
+        return get_origin(typ)
+
+    _ORIGIN_CACHE = _cache.IdentityCache(maxsize=4096, weak=False)
+    _ORIGIN_FORMS = (Union, Literal, Final, ClassVar)
+    _ORIGIN_FORM_TYPES = tuple(
+        (getattr(_typing, n), o)
+        for n, o in (("_Literal", Literal), ("_ClassVar", ClassVar), ("_Final", Final))
+        if hasattr(_typing, n)
+    )
 
     def _get_origin(typ):
+        # type: (Any) -> Any
+        """
+        Get the unsubscripted version of a type.
+
+        Results are cached per object identity in a bounded cache. Use
+        `get_origin.cache_info()` to get the cache statistics and
+        `get_origin.cache_clear()` to clear it.
+
+        :param typ: Type/typing form.
+        :return: Origin or None.
+        """
+        origin = _ORIGIN_CACHE.get(typ)
+        if origin is _cache.MISSING:
+            origin = _get_origin_uncached(typ)
+            _ORIGIN_CACHE.set(typ, origin)
+        return origin
+
+    def _get_origin_uncached(typ):
         # type: (Any) -> Any
         if typ is Generic:
             return Generic
 
-        if typ in (Union, Literal, Final, ClassVar):
+        if typ in _ORIGIN_FORMS:
             return None
 
-        for name, origin in {
-            "_Literal": Literal,
-            "_ClassVar": ClassVar,
-            "_Final": Final,
-        }.items():
-            if type(typ) is getattr(_typing, name, None):
+        for cls, origin in _ORIGIN_FORM_TYPES:
+            if type(typ) is cls:
                 return origin
 
         return _typing_inspect_get_origin(typ)
 
     _get_origin.__name__ = _get_origin.__qualname__ = "get_origin"
-    _get_origin.__doc__ = _typing_inspect_get_origin.__doc__
+    setattr(_get_origin, "cache_info", _ORIGIN_CACHE.info)
+    setattr(_get_origin, "cache_clear", _ORIGIN_CACHE.clear)
     globals()["get_origin"] = _get_origin
 
     _update_all("get_origin")
+    _mark("shim: get_origin")
 
 
 # Add missing get_args function for older Python versions.
-if "get_args" not in globals():
-    from typing_inspect import get_args as _typing_inspect_get_args
+if not _exists("get_args"):
+
+    def _typing_inspect_get_args(typ, evaluate):
+        # type: (Any, bool) -> Any
+        from typing_inspect import get_args
+
+        # Import typing_inspect on first use only, then replace this function.
+        globals()["_typing_inspect_get_args"] = get_args
+        return get_args(typ, evaluate)
+
+    _ARGS_CACHE = _cache.IdentityCache(maxsize=4096, weak=False)
 
     def _get_args(typ):
         # type: (Any) -> Any
-        return _typing_inspect_get_args(typ, True)
+        """
+        Get type arguments with all substitutions performed.
+
+        Results are cached per object identity in a bounded cache. Use
+        `get_args.cache_info()` to get the cache statistics and
+        `get_args.cache_clear()` to clear it.
+
+        :param typ: Type/typing form.
+        :return: Arguments.
+        """
+        entry = _ARGS_CACHE.get(typ)
+        if entry is _cache.MISSING:
+            args = tuple(_typing_inspect_get_args(typ, True))
+            entry = args, any(type(a) is list for a in args)
+            _ARGS_CACHE.set(typ, entry)
+        args, has_lists = entry
+
+        # Never hand out the cached lists (of callable arguments).
+        if has_lists:
+            return tuple(list(a) if type(a) is list else a for a in args)
+        return args
 
     _get_args.__name__ = _get_args.__qualname__ = "get_args"
-    _get_args.__doc__ = _typing_inspect_get_args.__doc__
+    setattr(_get_args, "cache_info", _ARGS_CACHE.info)
+    setattr(_get_args, "cache_clear", _ARGS_CACHE.clear)
     globals()["get_args"] = _get_args
 
     _update_all("get_args")
+    _mark("shim: get_args")
 
 
 # Add missing dataclass_transform function for older Python versions.
-if "dataclass_transform" not in globals():
+if not _exists("dataclass_transform"):
 
     def _dataclass_transform(
         eq_default=True,  # type: bool
@@ -478,6 +847,7 @@ if "dataclass_transform" not in globals():
     globals()["dataclass_transform"] = _dataclass_transform
 
     _update_all("dataclass_transform")
+    _mark("shim: dataclass_transform")
 
 
 # Function to get type name that supports generics.
@@ -500,87 +870,152 @@ _SPECIAL_NAMES = {
 }
 
 
-def get_name(typ, qualname_getter=lambda t: getattr(t, "__qualname__", None)):
-    # type: (Any, Callable[[Any], Optional[str]]) -> Optional[str]
+_SPECIAL_NAMES_BY_ID = dict((id(t), n) for t, n in _SPECIAL_NAMES.items())
+_SPECIAL_NAME_TYPES = tuple(
+    (getattr(_typing, c), n)
+    for c, n in (
+        ("_Literal", "Literal"),
+        ("_ClassVar", "ClassVar"),
+        ("_Final", "Final"),
+        ("_Union", "Union"),
+    )
+    if hasattr(_typing, c)
+)
+_NAME_PLAIN_TYPES = frozenset(
+    (
+        ForwardRef,
+        type(_T),
+        type(_member("ParamSpec")("_P")),
+    )
+)
+_NAME_RESOLVERS = _cache.IdentityCache()
+_NAME_CACHE = _cache.IdentityCache()
+
+
+def _get_qualname(typ):
+    # type: (Any) -> Optional[str]
+    return getattr(typ, "__qualname__", None)
+
+
+def get_name(typ, qualname_getter=None):
+    # type: (Any, Optional[Callable[[Any], Optional[str]]]) -> Optional[str]
     """
     Get name.
 
+    Names are cached per object identity (weakly when possible), unless a custom
+    `qualname_getter` is provided. Use `get_name.cache_info()` to get the cache
+    statistics and `get_name.cache_clear()` to clear it.
+
     :param typ: Type/typing form.
     :param qualname_getter: Qualified name getter function override.
     :return: Name or None.
     """
-    name = None
+    if qualname_getter is not None:
+        return _get_name(typ, qualname_getter)
 
-    # Special name.
-    try:
-        if typ in _SPECIAL_NAMES:
-            name = _SPECIAL_NAMES[typ]
-    except TypeError:  # ignore non-hashable
-        pass
+    name = _NAME_CACHE.get(typ)  # type: Optional[str]
+    if name is _cache.MISSING:
+        name = _get_name(typ, _get_qualname)
+        _NAME_CACHE.set(typ, name)
+    return name
 
-    # Python 2.7.
-    if name is None:
-        if not hasattr(typ, "__forward_arg__") and type(typ).__module__ in (
-            "typing",
-            "typing_extensions",
-            "tippo",
-        ):
-            if type(typ).__name__.lstrip("_") == "Literal":
-                return "Literal"
-            if type(typ).__name__.lstrip("_") == "Final":
-                return "Final"
-            if type(typ).__name__.lstrip("_") == "ClassVar":
-                return "ClassVar"
-
-    # Try a couple of other ways to get the name.
-    if name is None:
-        # Get origin name.
-        origin = get_origin(typ)
-        if origin is not None:
-            origin_name = (
-                qualname_getter(origin)
-                or getattr(origin, "__name__", None)
-                or getattr(origin, "_name", None)
-                or getattr(origin, "__forward_arg__", None)
-            )
-        else:
-            origin_name = None
-
-        # Get the name.
-        name = (
-            qualname_getter(typ)
-            or getattr(typ, "__name__", None)
-            or getattr(typ, "_name", None)
-            or getattr(typ, "__forward_arg__", None)
+
+setattr(get_name, "cache_info", _NAME_CACHE.info)
+setattr(get_name, "cache_clear", _NAME_CACHE.clear)
+
+
+def _get_name(typ, qualname_getter):
+    # type: (Any, Callable[[Any], Optional[str]]) -> Optional[str]
+
+    # Special name (they are all singletons).
+    name = _SPECIAL_NAMES_BY_ID.get(id(typ))
+    if name is not None:
+        return name
+
+    # Use the resolver for this kind of object.
+    cls = type(typ)
+    resolver = _NAME_RESOLVERS.get(cls)
+    if resolver is _cache.MISSING:
+        resolver = _get_name_resolver(cls)
+        _NAME_RESOLVERS.set(cls, resolver)
+    return cast(Optional[str], resolver(typ, qualname_getter))
+
+
+def _get_name_resolver(cls):
+    # type: (Type[Any]) -> Callable[..., Optional[str]]
+
+    # Python 2.7 special forms.
+    if cls.__module__ in ("typing", "typing_extensions", "tippo"):
+        name = cls.__name__.lstrip("_")
+        if name in ("Literal", "Final", "ClassVar"):
+            return lambda _typ, _qualname_getter: name
+
+    # Objects without origin.
+    if cls in _NAME_PLAIN_TYPES or (
+        issubclass(cls, type)
+        and (GenericMeta is type or not issubclass(cls, GenericMeta))
+    ):
+        return _get_plain_name
+
+    return _get_generic_name
+
+
+def _get_plain_name(typ, qualname_getter):
+    # type: (Any, Callable[[Any], Optional[str]]) -> Optional[str]
+    return (
+        qualname_getter(typ)
+        or getattr(typ, "__name__", None)
+        or getattr(typ, "_name", None)
+        or getattr(typ, "__forward_arg__", None)
+        or None
+    )
+
+
+def _get_generic_name(typ, qualname_getter):
+    # type: (Any, Callable[[Any], Optional[str]]) -> Optional[str]
+
+    # Get origin name.
+    origin = get_origin(typ)
+    if origin is not None:
+        origin_name = (
+            qualname_getter(origin)
+            or getattr(origin, "__name__", None)
+            or getattr(origin, "_name", None)
+            or getattr(origin, "__forward_arg__", None)
         )
+    else:
+        origin_name = None
+
+    # Get the name.
+    name = (
+        qualname_getter(typ)
+        or getattr(typ, "__name__", None)
+        or getattr(typ, "_name", None)
+        or getattr(typ, "__forward_arg__", None)
+    )
+
+    # We have an origin name.
+    if origin_name:
+        # But we don't have a name. Use the origin name instead.
+        if not name:
+            name = origin_name
+
+        # Prefer the origin name if longer and (for qualified generic names).
+        elif name and origin_name.endswith(name) and len(origin_name) > len(name):
+            name = origin_name
 
-        # We have an origin name.
-        if origin_name:
-            # But we don't have a name. Use the origin name instead.
-            if not name:
-                name = origin_name
-
-            # Prefer the origin name if longer and (for qualified generic names).
-            elif name and origin_name.endswith(name) and len(origin_name) > len(name):
-                name = origin_name
-
-        # Special cases.
-        elif not name:
-            for cls_name, special_name in {
-                "_Literal": "Literal",
-                "_ClassVar": "ClassVar",
-                "_Final": "Final",
-                "_Union": "Union",
-            }.items():
-                cls = getattr(_typing, cls_name, None)
-                if type(typ) is cls or origin is not None and type(origin) is cls:
-                    name = special_name
-                    break
+    # Special cases.
+    elif not name:
+        for cls, special_name in _SPECIAL_NAME_TYPES:
+            if type(typ) is cls or origin is not None and type(origin) is cls:
+                name = special_name
+                break
 
     return name or None
 
 
 _update_all("get_name")
+_mark("get_name")
 
 
 class SupportsGetItem(Protocol[_KT_contra, _VT_co]):
@@ -600,7 +1035,9 @@ class SupportsGetItem(Protocol[_KT_contra, _VT_co]):
 _update_all("SupportsGetItem")
 
 
-class SupportsGetSetItem(SupportsGetItem[_KT_contra, _VT_co]):
+class SupportsGetSetItem(
+    SupportsGetItem[_KT_contra, _VT_co], Protocol[_KT_contra, _VT_co]
+):
     """Settable and subscritable protocol."""
 
     def __setitem__(self, name, value):
@@ -611,7 +1048,9 @@ class SupportsGetSetItem(SupportsGetItem[_KT_contra, _VT_co]):
 _update_all("SupportsGetSetItem")
 
 
-class SupportsGetSetDeleteItem(SupportsGetSetItem[_KT_contra, _VT_co]):
+class SupportsGetSetDeleteItem(
+    SupportsGetSetItem[_KT_contra, _VT_co], Protocol[_KT_contra, _VT_co]
+):
     """Settable, deletable, and subscritable protocol."""
 
     def __delitem__(self, name):
@@ -646,3 +1085,85 @@ class SupportsKeysAndGetItem(Protocol[_KT, _VT_co]):
 
 
 _update_all("SupportsKeysAndGetItem")
+_mark("protocols")
+
+
+# Structural protocol checks.
+if TYPE_CHECKING:
+    from ._protocols import supports
+
+_update_submodule("._protocols", "supports")
+
+
+# Cached type hints.
+if TYPE_CHECKING:
+    from ._hints import get_type_hints_cached
+
+_update_submodule("._hints", "get_type_hints_cached")
+
+
+# Runtime type checking.
+if TYPE_CHECKING:
+    from ._checker import compile_checker, is_instance
+
+_update_submodule("._checker", "compile_checker", "is_instance")
+
+
+# Structural subtyping.
+if TYPE_CHECKING:
+    from ._subtype import is_subtype
+
+_update_submodule("._subtype", "is_subtype")
+
+
+# Serialization.
+if TYPE_CHECKING:
+    from ._serialize import dumps_type, loads_type
+
+_update_submodule("._serialize", "dumps_type", "loads_type")
+
+
+# Traversal.
+if TYPE_CHECKING:
+    from ._walk import TypeVisitor, walk
+
+_update_submodule("._walk", "TypeVisitor", "walk")
+_mark("submodules")
+
+
+# Write a fresh compatibility snapshot if there wasn't one.
+_SNAPSHOT_VALUES["all"] = tuple(_all_)
+if _SNAPSHOT is None:
+    _snapshot.save(_SNAPSHOT_VALUES)
+_mark("snapshot save")
+
+
+def __dir__():
+    # type: () -> List[str]
+    return sorted(set(globals()).union(_all_))
+
+
+if not TYPE_CHECKING:
+
+    def __getattr__(name):
+        # Resolve typing/typing_extensions members on first access and cache them.
+        value = _resolve(name)
+        globals()[name] = value
+        return value
+
+    # Python 2.7 doesn't support module-level __getattr__, use a module subclass.
+    if _sys.version_info[:2] < (3, 7):
+
+        class _LazyModule(_types.ModuleType):
+            def __getattr__(self, name):
+                value = __getattr__(name)
+                setattr(self, name, value)
+                return value
+
+            def __dir__(self):
+                return __dir__()
+
+        _lazy_module = _LazyModule(__name__, __doc__)
+        _lazy_module.__dict__.update(globals())
+        _lazy_module.__dict__["_module"] = _sys.modules[__name__]
+        _sys.modules[__name__] = _lazy_module
@@ -0,0 +1,203 @@
+"""Caches keyed by object identity used to memoize introspection results."""
+
+import collections
+import itertools
+import typing
+import weakref
+
+try:
+    from _thread import allocate_lock
+except ImportError:
+    from thread import allocate_lock  # type: ignore  # noqa
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Dict, Hashable, List, Tuple
+
+
+#: Cache statistics (same fields as the ones reported by `functools.lru_cache`).
+CacheInfo = collections.namedtuple("CacheInfo", "hits misses maxsize currsize")
+
+MISSING = object()
+
+
+class LRUCache(object):
+    """
+    Thread-safe, bounded, least recently used cache.
+
+    Hits only record a recency tick (no reordering), and when the cache grows past its
+    maximum size, the least recently used quarter of the entries is evicted at once.
+    """
+
+    __slots__ = (
+        "__weakref__",
+        "_maxsize",
+        "_data",
+        "_ticks",
+        "_lock",
+        "_hits",
+        "_misses",
+    )
+
+    def __init__(self, maxsize=1024):
+        # type: (int) -> None
+        self._maxsize = maxsize
+        self._data = {}  # type: Dict[Hashable, List[Any]]
+        self._ticks = itertools.count()
+        self._lock = allocate_lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._data)
+
+    @property
+    def maxsize(self):
+        # type: () -> int
+        """Maximum number of entries."""
+        return self._maxsize
+
+    def get(self, key, default=MISSING):
+        # type: (Hashable, Any) -> Any
+        """
+        Get value for key, marking it as the most recently used.
+
+        :param key: Key.
+        :param default: Value returned on a miss.
+        :return: Value or default.
+        """
+        try:
+            entry = self._data[key]
+        except KeyError:
+            self._misses += 1
+            return default
+        entry[1] = next(self._ticks)
+        self._hits += 1
+        return entry[0]
+
+    def set(self, key, value):
+        # type: (Hashable, Any) -> None
+        """
+        Set value for key, evicting the least recently used entries if full.
+
+        :param key: Key.
+        :param value: Value.
+        """
+        with self._lock:
+            data = self._data
+            data[key] = [value, next(self._ticks)]
+            if len(data) > self._maxsize:
+                entries = sorted(data.items(), key=lambda item: item[1][1])
+                for evicted_key, _ in entries[: len(data) - (self._maxsize * 3) // 4]:
+                    del data[evicted_key]
+
+    def info(self):
+        # type: () -> CacheInfo
+        """
+        Get statistics.
+
+        :return: Cache info.
+        """
+        return CacheInfo(self._hits, self._misses, self._maxsize, len(self._data))
+
+    def clear(self):
+        # type: () -> None
+        """Clear entries and statistics."""
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = 0
+
+
+class IdentityCache(object):
+    """
+    Cache keyed by object identity.
+
+    Weak-referenceable objects (classes, most typing forms) are held weakly and their
+    entries are discarded when they get garbage collected. Other objects (including
+    unhashable ones) are held strongly in a bounded LRU cache, which guarantees their
+    identity can't be reused while they are cached.
+
+    If `weak` is False, all objects are held in the bounded LRU cache instead, which
+    bounds the total number of entries.
+    """
+
+    __slots__ = ("__weakref__", "_weak", "_strong", "_weak_enabled", "_hits", "_misses")
+
+    def __init__(self, maxsize=1024, weak=True):
+        # type: (int, bool) -> None
+        self._weak = {}  # type: Dict[int, Tuple[weakref.ref[Any], Any]]
+        self._strong = LRUCache(maxsize)
+        self._weak_enabled = weak
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._weak) + len(self._strong)
+
+    def get(self, obj, default=MISSING):
+        # type: (Any, Any) -> Any
+        """
+        Get value cached for an object.
+
+        :param obj: Object.
+        :param default: Value returned on a miss.
+        :return: Value or default.
+        """
+        key = id(obj)
+        if self._weak_enabled:
+            entry = self._weak.get(key)
+            if entry is not None and entry[0]() is obj:
+                self._hits += 1
+                return entry[1]
+        strong = self._strong
+        strong_entry = strong._data.get(key)
+        if strong_entry is not None and strong_entry[0][0] is obj:
+            strong_entry[1] = next(strong._ticks)
+            self._hits += 1
+            return strong_entry[0][1]
+        self._misses += 1
+        return default
+
+    def set(self, obj, value):
+        # type: (Any, Any) -> None
+        """
+        Cache a value for an object.
+
+        :param obj: Object.
+        :param value: Value.
+        """
+        key = id(obj)
+        if not self._weak_enabled:
+            self._strong.set(key, (obj, value))
+            return
+        weak_entries = self._weak
+
+        def discard(ref):
+            # type: (weakref.ref[Any]) -> None
+            entry = weak_entries.get(key)
+            if entry is not None and entry[0] is ref:
+                weak_entries.pop(key, None)
+
+        try:
+            obj_ref = weakref.ref(obj, discard)
+        except TypeError:
+            self._strong.set(key, (obj, value))
+        else:
+            weak_entries[key] = (obj_ref, value)
+
+    def info(self):
+        # type: () -> CacheInfo
+        """
+        Get statistics.
+
+        :return: Cache info.
+        """
+        return CacheInfo(self._hits, self._misses, self._strong.maxsize, len(self))
+
+    def clear(self):
+        # type: () -> None
+        """Clear entries and statistics."""
+        self._weak.clear()
+        self._strong.clear()
+        self._hits = self._misses = 0
@@ -0,0 +1,438 @@
+"""Runtime checks of values against annotations, compiled into specialized closures."""
+
+import collections
+import sys
+import types
+import typing
+
+import typing_extensions
+
+from . import ForwardRef, TypeVar, _cache, _protocols, get_args, get_builtin, get_origin
+
+try:
+    import collections.abc as collections_abc
+except ImportError:
+    import collections as collections_abc  # type: ignore  # noqa
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List, Optional, Tuple
+
+    Checker = Callable[[Any], bool]
+    Namespace = Optional[Dict[str, Any]]
+
+
+def _get_forms(*names):
+    # type: (*str) -> Tuple[Any, ...]
+    forms = []  # type: List[Any]
+    for module in (typing, typing_extensions, sys.modules[__name__.rpartition(".")[0]]):
+        for name in names:
+            form = getattr(module, name, None)
+            if form is not None and not _is_form(form, forms):
+                forms.append(form)
+    return tuple(forms)
+
+
+def _is_form(obj, forms):
+    # type: (Any, typing.Iterable[Any]) -> bool
+    for form in forms:
+        if obj is form:
+            return True
+    return False
+
+
+_NONE_TYPE = type(None)
+_STRING_TYPES = (str, type(""))
+_ANY_FORMS = (object,) + _get_forms("Any", "Self", "ClassVar", "Final")
+_NEVER_FORMS = _get_forms("NoReturn", "Never")
+_STRING_FORMS = _get_forms("LiteralString")
+_UNION_FORMS = _get_forms("Union") + tuple(
+    t for t in (getattr(types, "UnionType", None),) if t is not None
+)
+_LITERAL_FORMS = _get_forms("Literal")
+_GUARD_FORMS = _get_forms("TypeGuard", "TypeIs")
+_WRAPPER_FORMS = _get_forms(
+    "Annotated", "ClassVar", "Final", "Required", "NotRequired", "ReadOnly"
+)
+_BARE_TUPLES = (tuple,) + _get_forms("Tuple")
+_CONTAINER_TYPES = tuple(
+    t
+    for t in (
+        collections_abc.Sequence,
+        collections_abc.Set,
+        collections_abc.KeysView,
+        collections_abc.ValuesView,
+        getattr(collections_abc, "Collection", None),
+        collections.deque,
+    )
+    if t is not None
+)
+_CHECKERS = _cache.IdentityCache(maxsize=4096)
+
+
+def _accept(_value):
+    # type: (Any) -> bool
+    return True
+
+
+def _reject(_value):
+    # type: (Any) -> bool
+    return False
+
+
+def _is_none(value):
+    # type: (Any) -> bool
+    return value is None
+
+
+def compile_checker(annotation, globalns=None, localns=None):
+    # type: (Any, Namespace, Namespace) -> Checker
+    """
+    Compile an annotation into a function that checks whether a value conforms to it.
+
+    The annotation is analysed once, and the resulting checker only does the work
+    specific to it. Checkers compiled without namespaces are cached per annotation.
+
+    Forward references are resolved on their first check, in the given namespaces or
+    in the namespace of the module they were declared in (when known).
+
+    :param annotation: Annotation.
+    :param globalns: Global namespace used to resolve forward references.
+    :param localns: Local namespace used to resolve forward references.
+    :return: Checker function.
+    :raises TypeError: Unsupported annotation.
+    """
+    if globalns is None and localns is None:
+        checker = _CHECKERS.get(annotation)  # type: Checker
+        if checker is _cache.MISSING:
+            checker = _compile(annotation, None, None)
+            _CHECKERS.set(annotation, checker)
+        return checker
+    return _compile(annotation, globalns, localns)
+
+
+def is_instance(value, annotation):
+    # type: (Any, Any) -> bool
+    """
+    Check whether a value conforms to an annotation.
+
+    :param value: Value.
+    :param annotation: Annotation.
+    :return: True if it conforms.
+    :raises TypeError: Unsupported annotation.
+    """
+    checker = _CHECKERS.get(annotation)  # type: Checker
+    if checker is _cache.MISSING:
+        checker = compile_checker(annotation)
+    return checker(value)
+
+
+def _get_args(annotation):
+    # type: (Any) -> Tuple[Any, ...]
+    try:
+        args = tuple(get_args(annotation))
+    except IndexError:
+        # typing_inspect can't get the arguments of `Tuple[()]` on Python 2.7.
+        args = tuple(getattr(annotation, "__args__", None) or ())
+    if args == ((),):
+        return ()
+    return args
+
+
+def _compile(annotation, globalns, localns):
+    # type: (Any, Namespace, Namespace) -> Checker
+    if annotation is None or annotation is _NONE_TYPE:
+        return _is_none
+    if isinstance(annotation, _STRING_TYPES):
+        annotation = ForwardRef(annotation)
+    if isinstance(annotation, ForwardRef):
+        return _compile_forward_ref(annotation, globalns, localns)
+    if isinstance(annotation, TypeVar):
+        return _compile_type_var(annotation, globalns, localns)
+    if _is_form(annotation, _ANY_FORMS):
+        return _accept
+    if _is_form(annotation, _NEVER_FORMS):
+        return _reject
+    if _is_form(annotation, _STRING_FORMS):
+        return _compile_class(str)
+
+    # NewType (a function before Python 3.10).
+    supertype = getattr(annotation, "__supertype__", None)
+    if supertype is not None:
+        return compile_checker(supertype, globalns, localns)
+
+    origin = get_origin(annotation)
+    if origin is None:
+        if isinstance(annotation, type):
+            return _compile_class(annotation)
+        error = "unsupported annotation {!r}".format(annotation)
+        raise TypeError(error)
+
+    args = _get_args(annotation)
+    if _is_form(origin, _UNION_FORMS):
+        return _compile_union(args, globalns, localns)
+    if _is_form(origin, _LITERAL_FORMS):
+        return _compile_literal(args)
+    if _is_form(origin, _WRAPPER_FORMS):
+        if not args:
+            return _accept
+        return compile_checker(args[0], globalns, localns)
+    if _is_form(origin, _GUARD_FORMS):
+        return _compile_class(bool)
+
+    cls = get_builtin(origin)
+    if not isinstance(cls, type):
+        error = "unsupported annotation {!r}".format(annotation)
+        raise TypeError(error)
+    if issubclass(cls, tuple) and not _is_form(annotation, _BARE_TUPLES):
+        return _compile_tuple(cls, args, globalns, localns)
+    if not args or _protocols.is_protocol(cls):
+        return _compile_class(cls)
+    if cls is type:
+        return _compile_type(args[0])
+    if _is_form(cls, (collections_abc.Callable,)):
+        return callable
+    if issubclass(cls, collections_abc.Mapping):
+        return _compile_mapping(cls, args, globalns, localns)
+    if len(args) == 1 and issubclass(cls, _CONTAINER_TYPES):
+        return _compile_container(cls, args[0], globalns, localns)
+    return _compile_class(cls)
+
+
+def _compile_class(cls):
+    # type: (type) -> Checker
+    if cls is object:
+        return _accept
+    if _protocols.is_protocol(cls):
+        return _protocols.get_checker(cls)
+    if issubclass(cls, dict) and hasattr(cls, "__total__"):
+        return _compile_typed_dict(cls)
+
+    def check(value):
+        # type: (Any) -> bool
+        return isinstance(value, cls)
+
+    return check
+
+
+def _get_class(annotation):
+    # type: (Any) -> Optional[type]
+    """Get the class a plain `isinstance` check against an annotation would use."""
+    if annotation is None:
+        return _NONE_TYPE
+    if (
+        isinstance(annotation, type)
+        and not _is_form(annotation, _ANY_FORMS)
+        and get_origin(annotation) is None
+        and not _protocols.is_protocol(annotation)
+        and not (issubclass(annotation, dict) and hasattr(annotation, "__total__"))
+    ):
+        return annotation
+    return None
+
+
+def _compile_union(args, globalns, localns):
+    # type: (Tuple[Any, ...], Namespace, Namespace) -> Checker
+    classes_list = []  # type: List[type]
+    checkers = []  # type: List[Checker]
+    for arg in args:
+        cls = _get_class(arg)
+        if cls is not None:
+            classes_list.append(cls)
+            continue
+        checker = compile_checker(arg, globalns, localns)
+        if checker is _accept:
+            return _accept
+        checkers.append(checker)
+
+    # Plain classes are checked all at once.
+    classes = tuple(classes_list)
+    if not checkers:
+
+        def check_classes(value):
+            # type: (Any) -> bool
+            return isinstance(value, classes)
+
+        return check_classes
+
+    def check(value):
+        # type: (Any) -> bool
+        if isinstance(value, classes):
+            return True
+        for checker in checkers:
+            if checker(value):
+                return True
+        return False
+
+    return check
+
+
+def _compile_literal(args):
+    # type: (Tuple[Any, ...]) -> Checker
+
+    # Literal values are compared along with their exact types, so that `True` doesn't
+    # match `Literal[1]`, for example.
+    values = frozenset((type(a), a) for a in args)
+
+    def check(value):
+        # type: (Any) -> bool
+        try:
+            return (type(value), value) in values
+        except TypeError:
+            return False
+
+    return check
+
+
+def _compile_tuple(cls, args, globalns, localns):
+    # type: (Any, Tuple[Any, ...], Namespace, Namespace) -> Checker
+
+    # Variadic tuple.
+    if len(args) == 2 and args[1] is Ellipsis:
+        return _compile_container(cls, args[0], globalns, localns)
+
+    # Fixed-length tuple.
+    checkers = tuple(compile_checker(a, globalns, localns) for a in args)
+    length = len(checkers)
+
+    def check(value):
+        # type: (Any) -> bool
+        if not isinstance(value, cls) or len(value) != length:
+            return False
+        for checker, item in zip(checkers, value):
+            if not checker(item):
+                return False
+        return True
+
+    return check
+
+
+def _compile_type(arg):
+    # type: (Any) -> Checker
+    if isinstance(arg, TypeVar):
+        if arg.__bound__ is not None:
+            args = (arg.__bound__,)  # type: Tuple[Any, ...]
+        else:
+            args = tuple(arg.__constraints__) or (object,)
+    elif _is_form(get_origin(arg), _UNION_FORMS):
+        args = _get_args(arg)
+    else:
+        args = (arg,)
+    if any(_is_form(a, _ANY_FORMS) for a in args):
+        return _compile_class(type)
+    classes = tuple(_get_class(a) for a in args)  # type: Tuple[Any, ...]
+    if None in classes:
+        error = "unsupported type argument {!r}".format(arg)
+        raise TypeError(error)
+
+    def check(value):
+        # type: (Any) -> bool
+        return isinstance(value, type) and issubclass(value, classes)
+
+    return check
+
+
+def _compile_mapping(cls, args, globalns, localns):
+    # type: (Any, Tuple[Any, ...], Namespace, Namespace) -> Checker
+    key_checker = compile_checker(args[0], globalns, localns)
+    if len(args) > 1:
+        value_checker = compile_checker(args[1], globalns, localns)
+    else:
+        value_checker = _accept
+    if key_checker is _accept and value_checker is _accept:
+        return _compile_class(cls)
+
+    def check(value):
+        # type: (Any) -> bool
+        if not isinstance(value, cls):
+            return False
+        for key in value:
+            if not key_checker(key) or not value_checker(value[key]):
+                return False
+        return True
+
+    return check
+
+
+def _compile_container(cls, arg, globalns, localns):
+    # type: (Any, Any, Namespace, Namespace) -> Checker
+    item_checker = compile_checker(arg, globalns, localns)
+    if item_checker is _accept:
+        return _compile_class(cls)
+
+    def check(value):
+        # type: (Any) -> bool
+        if not isinstance(value, cls):
+            return False
+        for item in value:
+            if not item_checker(item):
+                return False
+        return True
+
+    return check
+
+
+def _compile_typed_dict(cls):
+    # type: (type) -> Checker
+    annotations = getattr(cls, "__annotations__", {})
+    required = getattr(cls, "__required_keys__", None)
+    if required is None:
+        required = frozenset(annotations) if getattr(cls, "__total__", True) else ()
+    required = tuple(required)
+
+    # Forward references are resolved in the module the typed dict was declared in.
+    module = sys.modules.get(getattr(cls, "__module__", None) or "")
+    globalns = getattr(module, "__dict__", None)
+    checkers = dict(
+        (k, compile_checker(a, globalns, None)) for k, a in annotations.items()
+    )
+
+    def check(value):
+        # type: (Any) -> bool
+        if not isinstance(value, dict):
+            return False
+        for key in required:
+            if key not in value:
+                return False
+        for key in value:
+            item_checker = checkers.get(key)
+            if item_checker is None or not item_checker(value[key]):
+                return False
+        return True
+
+    return check
+
+
+def _compile_type_var(type_var, globalns, localns):
+    # type: (Any, Namespace, Namespace) -> Checker
+    if type_var.__bound__ is not None:
+        return compile_checker(type_var.__bound__, globalns, localns)
+    if type_var.__constraints__:
+        return _compile_union(type_var.__constraints__, globalns, localns)
+    return _accept
+
+
+def _compile_forward_ref(forward_ref, globalns, localns):
+    # type: (Any, Namespace, Namespace) -> Checker
+    resolved = []  # type: List[Checker]
+
+    def check(value):
+        # type: (Any) -> bool
+        if not resolved:
+            annotation = _evaluate_forward_ref(forward_ref, globalns, localns)
+            resolved.append(compile_checker(annotation, globalns, localns))
+        return resolved[0](value)
+
+    return check
+
+
+def _evaluate_forward_ref(forward_ref, globalns, localns):
+    # type: (Any, Namespace, Namespace) -> Any
+    if globalns is None and localns is None:
+        module = sys.modules.get(getattr(forward_ref, "__forward_module__", None) or "")
+        globalns = getattr(module, "__dict__", None)
+        if globalns is None:
+            error = "can't resolve forward reference {!r} without a namespace".format(
+                forward_ref.__forward_arg__
+            )
+            raise NameError(error)
+    return eval(forward_ref.__forward_arg__, globalns or {}, localns)
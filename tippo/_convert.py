@@ -0,0 +1,159 @@
+"""Deep conversion of type expressions between typing and builtin generics."""
+
+import sys
+import types
+import typing
+import weakref
+
+import typing_extensions
+
+from . import _cache, _walk, get_builtin, get_origin, get_typing
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Hashable, List, Tuple
+
+    from ._walk import Path
+
+#: Whether builtins and `collections.abc` classes can be parameterized (PEP 585).
+PEP_585 = sys.version_info[:2] >= (3, 9)
+
+_UNION_ORIGINS = tuple(
+    o for o in (typing.Union, getattr(types, "UnionType", None)) if o is not None
+)
+_LITERAL_ORIGINS = tuple(
+    o
+    for o in (getattr(typing, "Literal", None), typing_extensions.Literal)
+    if o is not None
+)
+_ANNOTATED_ORIGINS = tuple(
+    o
+    for o in (
+        getattr(typing, "Annotated", None),
+        getattr(typing_extensions, "Annotated", None),
+    )
+    if o is not None
+)
+_TUPLE_ORIGINS = (tuple, typing.Tuple)
+
+# Structurally equal results (held weakly) and results per input (also held weakly).
+_INTERNED = weakref.WeakValueDictionary()  # type: weakref.WeakValueDictionary[Any, Any]
+_BUILTIN_RESULTS = _cache.IdentityCache(maxsize=4096)
+_TYPING_RESULTS = _cache.IdentityCache(maxsize=4096)
+
+
+def convert(typ, builtin):
+    # type: (Any, bool) -> Any
+    """
+    Convert a type expression recursively to builtin or typing generics.
+
+    Builtin generics are only produced where supported (PEP 585), typing generics are
+    produced elsewhere. Results are interned, so structurally equal results are the
+    same object.
+
+    :param typ: Type expression.
+    :param builtin: True to convert to builtin generics, False for typing generics.
+    :return: Converted type expression.
+    """
+    results = _BUILTIN_RESULTS if builtin else _TYPING_RESULTS
+    result = results.get(typ)
+    if result is _cache.MISSING:
+        result = _Converter(results, builtin and PEP_585).visit(typ)
+    return result
+
+
+def _is(obj, objs):
+    # type: (Any, Tuple[Any, ...]) -> bool
+    for o in objs:
+        if obj is o:
+            return True
+    return False
+
+
+def _get_key(obj):
+    # type: (Any) -> Hashable
+    """Get an interning key component (converted generics are compared by identity)."""
+    if isinstance(obj, list):
+        return list, tuple(_get_key(o) for o in obj)
+    if get_origin(obj) is None:
+        try:
+            key = type(obj), obj
+            hash(key)
+        except TypeError:
+            pass
+        else:
+            return key
+    return id(obj)
+
+
+class _Converter(_walk.TypeVisitor):
+    """Converts type expressions bottom-up, reusing the results for known nodes."""
+
+    __slots__ = ("results", "builtin")
+
+    def __init__(self, results, builtin):
+        # type: (_cache.IdentityCache, bool) -> None
+        self.results = results
+        self.builtin = builtin
+
+    def enter(self, path, node, origin, args):
+        # type: (Path, Any, Any, Tuple[Any, ...]) -> bool
+        return self.results.get(node) is _cache.MISSING
+
+    def leave(self, path, node, origin, args, results):
+        # type: (Path, Any, Any, Tuple[Any, ...], List[Any]) -> Any
+        if isinstance(node, list):
+            return results  # callable arguments
+        result = self.results.get(node)
+        if result is _cache.MISSING:
+            result = self._convert(node, origin, args, results)
+            self.results.set(node, result)
+        return result
+
+    def _convert(self, typ, origin, args, results):
+        # type: (Any, Any, Tuple[Any, ...], List[Any]) -> Any
+        builtin = self.builtin
+        if origin is None:
+            return get_builtin(typ) if builtin else get_typing(typ)
+
+        # Unparameterized generics.
+        if not args and (not _is(origin, _TUPLE_ORIGINS) or _is(typ, _TUPLE_ORIGINS)):
+            return get_builtin(origin) if builtin else get_typing(origin)
+
+        # Get the form to parameterize with the new arguments.
+        if _is(origin, _LITERAL_ORIGINS):
+            form = origin
+            new_args = args
+        elif _is(origin, _ANNOTATED_ORIGINS):
+            form = origin
+            new_args = (results[0],) + args[1:]
+        elif _is(origin, _UNION_ORIGINS):
+            form = typing.Union
+            new_args = tuple(results)
+        else:
+            form = get_builtin(origin) if builtin else get_typing(origin)
+            new_args = tuple(results)
+
+        # Intern the result.
+        key = (id(form), tuple(_get_key(a) for a in new_args))
+        result = _INTERNED.get(key)
+        if result is None:
+            result = _parameterize(typ, form, new_args)
+            try:
+                _INTERNED[key] = result
+            except TypeError:
+                pass
+        return result
+
+
+def _parameterize(typ, form, args):
+    # type: (Any, Any, Tuple[Any, ...]) -> Any
+    params = args[0] if len(args) == 1 else args  # type: Any
+    try:
+        return form[params]
+    except TypeError:
+        # Forms that can't be parameterized (like `contextlib.AbstractContextManager`
+        # before PEP 585) keep the original generic alias.
+        copy_with = getattr(typ, "copy_with", None)
+        if copy_with is None:
+            return typ
+        return copy_with(args)
@@ -0,0 +1,179 @@
+"""Type hints resolution cached per class and shared across classes of a module."""
+
+import sys
+import types
+import typing
+
+from . import ForwardRef, _cache, get_type_hints
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Dict, Hashable, Optional
+
+_NONE_TYPE = type(None)
+_eval_type = getattr(typing, "_eval_type")
+
+
+class _ModuleCache(object):
+    """Resolved annotations of a module's classes."""
+
+    __slots__ = ("annotations", "classes")
+
+    def __init__(self):
+        # type: () -> None
+
+        # Annotations that resolved in the module's namespace alone are shared by all
+        # of its classes.
+        self.annotations = {}  # type: Dict[Hashable, Any]
+
+        # Own (not inherited) hints per class, held weakly.
+        self.classes = _cache.IdentityCache()
+
+
+# Module caches by module name, and resolved hints per object (held weakly).
+_MODULES = {}  # type: Dict[str, _ModuleCache]
+_HINTS = _cache.IdentityCache()
+
+
+def get_type_hints_cached(obj):
+    # type: (Any) -> Dict[str, Any]
+    """
+    Get type hints for an object, like `get_type_hints` (including extras such as
+    `Annotated`), caching the results.
+
+    For classes, the annotations of each class in the MRO are resolved once and
+    reused for all of its subclasses, and annotations resolved in a module's namespace
+    are shared by all the classes of that module. Classes are held weakly.
+
+    Use `get_type_hints_cached.invalidate(obj)` to invalidate the results for an object
+    and the module it was declared in (after reloading it, for example).
+
+    :param obj: Class, module, function, or method.
+    :return: Type hints (a new dictionary on every call).
+    :raises NameError: Could not resolve forward reference.
+    """
+    hints = _HINTS.get(obj)  # type: Dict[str, Any]
+    if hints is _cache.MISSING:
+        if isinstance(obj, type):
+            hints = {}
+            for base in reversed(obj.__mro__):
+                hints.update(_get_own_hints(base))
+        elif _INCLUDE_EXTRAS:
+            hints = get_type_hints(obj, include_extras=True)
+        else:
+            hints = get_type_hints(obj) or {}  # always None on Python 2.7
+        _HINTS.set(obj, hints)
+    return dict(hints)
+
+
+def invalidate(obj=None):
+    # type: (Any) -> None
+    """
+    Invalidate the cached type hints of an object and of all the classes declared in
+    the same module. Hints derived from them (subclasses in other modules) are
+    invalidated as well.
+
+    :param obj: Class, module, function, method, or module name (None for all).
+    """
+    if obj is None:
+        _MODULES.clear()
+        _HINTS.clear()
+        return
+    if isinstance(obj, str):
+        module_name = obj  # type: Optional[str]
+    elif isinstance(obj, types.ModuleType):
+        module_name = obj.__name__
+    else:
+        module_name = getattr(obj, "__module__", None)
+    if module_name is not None:
+        _MODULES.pop(module_name, None)
+    _HINTS.clear()
+
+
+def cache_info():
+    # type: () -> _cache.CacheInfo
+    """
+    Get statistics.
+
+    :return: Cache info.
+    """
+    return _HINTS.info()
+
+
+setattr(get_type_hints_cached, "invalidate", invalidate)
+setattr(get_type_hints_cached, "cache_info", cache_info)
+setattr(get_type_hints_cached, "cache_clear", invalidate)
+
+
+def _get_include_extras():
+    # type: () -> bool
+    try:
+        code = getattr(get_type_hints, "__code__")
+    except AttributeError:
+        return False
+    return "include_extras" in code.co_varnames[: code.co_argcount]
+
+
+_INCLUDE_EXTRAS = _get_include_extras()
+
+
+def _get_own_hints(cls):
+    # type: (Any) -> Dict[str, Any]
+    annotations = cls.__dict__.get("__annotations__", None)
+    if not annotations or not isinstance(annotations, dict):
+        return {}
+
+    module_name = getattr(cls, "__module__", None) or ""
+    module_cache = _MODULES.get(module_name)
+    if module_cache is None:
+        module_cache = _MODULES.setdefault(module_name, _ModuleCache())
+    hints = module_cache.classes.get(cls)  # type: Dict[str, Any]
+    if hints is not _cache.MISSING:
+        return hints
+
+    module_globals = getattr(sys.modules.get(module_name), "__dict__", {})
+    class_namespace = None  # type: Optional[Dict[str, Any]]
+    hints = {}
+    for name, value in annotations.items():
+        if value is None:
+            hints[name] = _NONE_TYPE
+            continue
+
+        # Try the annotations already resolved for this module first.
+        try:
+            hints[name] = module_cache.annotations[value]
+            continue
+        except (KeyError, TypeError):
+            pass
+
+        # Like `get_type_hints`, look in the module's namespace first, then in the
+        # class' namespace. Only the former can be shared with other classes.
+        annotation = _to_forward_ref(value)
+        try:
+            resolved = _eval_type(annotation, module_globals, None)
+        except NameError:
+            if class_namespace is None:
+                class_namespace = dict(vars(cls))
+            resolved = _eval_type(annotation, class_namespace, module_globals)
+        else:
+            try:
+                module_cache.annotations[value] = resolved
+            except TypeError:
+                pass
+        hints[name] = resolved
+
+    module_cache.classes.set(cls, hints)
+    return hints
+
+
+def _to_forward_ref(value):
+    # type: (Any) -> Any
+    if not isinstance(value, (str, type(""))):
+        return value
+    try:
+        return ForwardRef(value, is_argument=False, is_class=True)
+    except TypeError:
+        pass
+    try:
+        return ForwardRef(value, is_argument=False)
+    except TypeError:
+        return ForwardRef(value)
@@ -0,0 +1,210 @@
+"""Structural checks of values against protocols, cached per concrete class."""
+
+import types
+import typing
+import weakref
+
+import typing_extensions
+
+from . import _cache, get_origin
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Callable, Dict, FrozenSet, Tuple
+
+#: Instances of Python 2.7 old-style classes all share this type.
+_INSTANCE_TYPE = getattr(types, "InstanceType", None)
+
+_BASES = tuple(
+    b
+    for b in (
+        object,
+        typing.Generic,
+        getattr(typing, "Protocol", None),
+        getattr(typing_extensions, "Protocol", None),
+    )
+    if b is not None
+)
+
+# Attributes set on protocol classes that are not members of the protocols.
+_EXCLUDED = frozenset(
+    (
+        "__abstractmethods__",
+        "__annotations__",
+        "__args__",
+        "__callable_proto_members_only__",
+        "__class_getitem__",
+        "__dict__",
+        "__doc__",
+        "__extra__",
+        "__firstlineno__",
+        "__init__",
+        "__match_args__",
+        "__metaclass__",
+        "__module__",
+        "__new__",
+        "__next_in_mro__",
+        "__non_callable_proto_members__",
+        "__orig_bases__",
+        "__orig_class__",
+        "__origin__",
+        "__parameters__",
+        "__protocol_attrs__",
+        "__qualname__",
+        "__slotnames__",
+        "__slots__",
+        "__static_attributes__",
+        "__subclasshook__",
+        "__tree_hash__",
+        "__type_params__",
+        "__weakref__",
+        "_callable_members_only",
+        "_gorg",
+        "_is_protocol",
+        "_is_runtime_protocol",
+    )
+)
+
+_CHECKERS = _cache.IdentityCache()
+
+
+def is_protocol(cls):
+    # type: (Any) -> bool
+    """
+    Get whether a class is a protocol (not including the `Protocol` base itself).
+
+    :param cls: Class.
+    :return: True if protocol.
+    """
+    return bool(getattr(cls, "_is_protocol", False)) and not _is_base(cls)
+
+
+def _is_base(cls):
+    # type: (Any) -> bool
+    for base in _BASES:
+        if cls is base:
+            return True
+    return False
+
+
+def get_members(protocol):
+    # type: (type) -> Tuple[FrozenSet[str], FrozenSet[str]]
+    """
+    Get the members of a protocol, split between the ones defined in the protocol
+    classes (methods, properties, defaults) and the ones only declared as annotations
+    (usually set on instances).
+
+    :param protocol: Protocol class.
+    :return: Defined members, declared members.
+    """
+    defined = set()
+    declared = set()
+    for base in protocol.__mro__:
+        if not is_protocol(base):
+            continue
+        for name in base.__dict__:
+            if not name.startswith("_abc_") and name not in _EXCLUDED:
+                defined.add(name)
+        for name in base.__dict__.get("__annotations__", {}):
+            if not name.startswith("_abc_") and name not in _EXCLUDED:
+                declared.add(name)
+    return frozenset(defined), frozenset(declared.difference(defined))
+
+
+def get_checker(protocol):
+    # type: (Any) -> Callable[[Any], bool]
+    """
+    Get a function that structurally checks values against a protocol.
+
+    The protocol's members are gathered once, and whether a class implements them is
+    only computed the first time one of its instances is checked. Members that are
+    only declared as annotations and not found in the class are looked up on each
+    instance. Classes are expected not to gain or lose members after being checked.
+
+    :param protocol: Protocol class (can be parameterized).
+    :return: Checker function.
+    :raises TypeError: Not a protocol.
+    """
+    checker = _CHECKERS.get(protocol)  # type: Callable[[Any], bool]
+    if checker is _cache.MISSING:
+        checker = _compile(protocol)
+        _CHECKERS.set(protocol, checker)
+    return checker
+
+
+def supports(value, protocol):
+    # type: (Any, Any) -> bool
+    """
+    Check whether a value structurally implements a protocol.
+
+    Unlike `isinstance`, this works with protocols that are not runtime checkable, and
+    the result is cached per protocol and class (held weakly), so repeated checks
+    against instances of the same class are constant time.
+
+    :param value: Value.
+    :param protocol: Protocol class (can be parameterized).
+    :return: True if implemented.
+    :raises TypeError: Not a protocol.
+    """
+    checker = _CHECKERS.get(protocol)  # type: Callable[[Any], bool]
+    if checker is _cache.MISSING:
+        checker = get_checker(protocol)
+    return checker(value)
+
+
+def _compile(protocol):
+    # type: (Any) -> Callable[[Any], bool]
+    origin = get_origin(protocol) or protocol
+    if not isinstance(origin, type) or not is_protocol(origin):
+        error = "{!r} is not a protocol".format(protocol)
+        raise TypeError(error)
+
+    # Methods set to None mark the protocol as explicitly not supported (like
+    # `__hash__`), so they need to be resolved.
+    defined, declared = get_members(origin)
+    methods = tuple(sorted(n for n in defined if callable(getattr(origin, n, None))))
+    attributes = tuple(sorted(declared.union(defined.difference(methods))))
+
+    # Verdicts per class, held weakly: True, False, or the attributes to look up on
+    # instances. Entries are looked up inline (not through a cache object) since this
+    # runs on every check.
+    verdicts = {}  # type: Dict[int, Tuple[weakref.ref[type], Any]]
+
+    def get_verdict(cls):
+        # type: (type) -> Any
+        verdict = True  # type: Any
+        for name in methods:
+            if getattr(cls, name, None) is None:
+                verdict = False
+                break
+        else:
+            verdict = tuple(n for n in attributes if not hasattr(cls, n)) or True
+
+        key = id(cls)
+
+        def discard(ref):
+            # type: (weakref.ref[type]) -> None
+            entry = verdicts.get(key)
+            if entry is not None and entry[0] is ref:
+                verdicts.pop(key, None)
+
+        verdicts[key] = (weakref.ref(cls, discard), verdict)
+        return verdict
+
+    def check(value):
+        # type: (Any) -> bool
+        cls = type(value)
+        if cls is _INSTANCE_TYPE:
+            cls = value.__class__
+        entry = verdicts.get(id(cls))
+        if entry is not None and entry[0]() is cls:
+            verdict = entry[1]
+        else:
+            verdict = get_verdict(cls)
+        if verdict is True or verdict is False:
+            return verdict
+        for name in verdict:
+            if not hasattr(value, name):
+                return False
+        return True
+
+    return check
@@ -0,0 +1,446 @@
+"""Compact serialization of type expressions."""
+
+import importlib
+import json
+import re
+import typing
+
+import six
+import typing_extensions
+
+from . import (
+    ForwardRef,
+    ParamSpec,
+    TypeVar,
+    _cache,
+    _member,
+    get_args,
+    get_name,
+    get_origin,
+)
+from ._convert import convert
+
+try:
+    import builtins
+except ImportError:
+    import __builtin__ as builtins  # type: ignore  # noqa
+
+try:
+    from enum import Enum
+except ImportError:
+    _ENUM_TYPES = ()  # type: Tuple[type, ...]
+else:
+    _ENUM_TYPES = (Enum,)
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List, Tuple, Union
+
+
+def _get_forms(*names):
+    # type: (*str) -> Tuple[Any, ...]
+    forms = []  # type: List[Any]
+    for module in (typing, typing_extensions):
+        for name in names:
+            form = getattr(module, name, None)
+            if form is not None and not any(form is f for f in forms):
+                forms.append(form)
+    return tuple(forms)
+
+
+def _is(obj, objs):
+    # type: (Any, Tuple[Any, ...]) -> bool
+    for o in objs:
+        if obj is o:
+            return True
+    return False
+
+
+_NONE_TYPE = type(None)
+_UNION_FORMS = _get_forms("Union") + tuple(
+    o for o in (getattr(__import__("types"), "UnionType", None),) if o is not None
+)
+_LITERAL_FORMS = _get_forms("Literal")
+_ANNOTATED_FORMS = _get_forms("Annotated")
+_TUPLE_FORMS = (tuple, typing.Tuple)
+_PARAM_SPEC_TYPES = tuple(
+    t for t in _get_forms("ParamSpec") + (ParamSpec,) if isinstance(t, type)
+)
+
+# Header of the binary form (followed by the UTF-8 encoded string form).
+_BINARY_HEADER = b"\x01"
+
+_NAME = re.compile(r"[A-Za-z_][\w.]*(?::[A-Za-z_][\w.]*)?")
+_NUMBER = re.compile(r"-?\d+")
+_scanstring = getattr(json.decoder, "scanstring")
+
+# Serialized type expressions (held weakly), parsed expressions by string, resolved
+# references by name, and type variables by definition.
+_DUMPED = _cache.IdentityCache(maxsize=4096)
+_LOADED = _cache.LRUCache(maxsize=4096)
+_REFERENCES = {}  # type: Dict[str, Any]
+_TYPE_VARS = {}  # type: Dict[str, Any]
+
+
+def dumps_type(typ, binary=False):
+    # type: (Any, bool) -> Union[str, bytes]
+    """
+    Serialize a type expression into a compact string (or bytes).
+
+    Supports nested generics, unions, literals (of None, bools, integers, strings,
+    bytes, and enum members), forward references, type variables, parameter
+    specifications, and classes (and other objects) that can be imported by their
+    module and qualified name.
+
+    :param typ: Type expression.
+    :param binary: Whether to get bytes instead of a string.
+    :return: Serialized type expression.
+    :raises TypeError: Type expression can't be serialized.
+    """
+    data = _DUMPED.get(typ)  # type: str
+    if data is _cache.MISSING:
+        data = _dump(convert(typ, False))
+        _DUMPED.set(typ, data)
+    if binary:
+        return _BINARY_HEADER + data.encode("utf-8")
+    return data
+
+
+def loads_type(data):
+    # type: (Union[str, bytes]) -> Any
+    """
+    Load a type expression serialized with `dumps_type`.
+
+    Results are cached, as well as module and attribute lookups. Use
+    `loads_type.cache_info()` to get the cache statistics and `loads_type.cache_clear()`
+    to clear it. Note that modules referenced by the data get imported, so only load
+    data from trusted sources.
+
+    :param data: Serialized type expression.
+    :return: Type expression.
+    :raises ValueError: Invalid data.
+    :raises ImportError: Could not import referenced module.
+    :raises AttributeError: Could not find referenced object.
+    """
+    if isinstance(data, bytes) and data.startswith(_BINARY_HEADER):
+        text = data[len(_BINARY_HEADER) :].decode("utf-8")  # type: str
+    elif isinstance(data, six.string_types):
+        text = data
+    else:
+        error = "invalid type expression data {!r}".format(data)
+        raise ValueError(error)
+    typ = _LOADED.get(text)
+    if typ is _cache.MISSING:
+        typ = _Parser(text).parse()
+        _LOADED.set(text, typ)
+    return typ
+
+
+def _cache_clear():
+    # type: () -> None
+    _LOADED.clear()
+    _REFERENCES.clear()
+
+
+setattr(loads_type, "cache_info", _LOADED.info)
+setattr(loads_type, "cache_clear", _cache_clear)
+
+
+def _get_args(typ):
+    # type: (Any) -> Tuple[Any, ...]
+    try:
+        args = tuple(get_args(typ))
+    except IndexError:
+        # typing_inspect can't get the arguments of `Tuple[()]` on Python 2.7.
+        args = tuple(getattr(typ, "__args__", None) or ())
+    if args == ((),):
+        return ()
+    return args
+
+
+def _dump(typ):
+    # type: (Any) -> str
+    if typ is None or typ is _NONE_TYPE:
+        return "None"
+    if typ is Ellipsis:
+        return "..."
+    if isinstance(typ, (TypeVar,) + _PARAM_SPEC_TYPES):
+        return _dump_type_var(typ)
+    if isinstance(typ, list):
+        return "[{}]".format(",".join(_dump(t) for t in typ))
+    if isinstance(typ, six.string_types):
+        return json.dumps(typ)
+    if isinstance(typ, ForwardRef):
+        return json.dumps(typ.__forward_arg__)
+
+    origin = get_origin(typ)
+    if origin is None or _is(typ, _TUPLE_FORMS):
+        return _dump_reference(typ)
+    args = _get_args(typ)
+    if _is(origin, _LITERAL_FORMS):
+        return "Literal[{}]".format(",".join(_dump_value(a) for a in args))
+    if _is(origin, _UNION_FORMS):
+        return "Union[{}]".format(",".join(_dump(a) for a in args))
+    if _is(origin, _ANNOTATED_FORMS):
+        metadata = getattr(typ, "__metadata__", args[1:])
+        return "Annotated[{},{}]".format(
+            _dump(args[0]), ",".join(_dump_value(m) for m in metadata)
+        )
+    head = _dump_reference(convert(origin, False))
+    if not args:
+        if _is(origin, _TUPLE_FORMS):
+            return "{}[()]".format(head)
+        return head
+    return "{}[{}]".format(head, ",".join(_dump(a) for a in args))
+
+
+def _dump_reference(obj):
+    # type: (Any) -> str
+
+    # Builtins and tippo members are referenced by name only.
+    name = get_name(obj)
+    if name:
+        if getattr(builtins, name, None) is obj:
+            return str(name)
+        try:
+            if _member(name) is obj:
+                return str(name)
+        except AttributeError:
+            pass
+
+    # Others by module and qualified name.
+    module = getattr(obj, "__module__", None)
+    qualname = getattr(obj, "__qualname__", None) or getattr(obj, "__name__", None)
+    if module and qualname and "<" not in qualname:
+        reference = "{}:{}".format(module, qualname)
+        try:
+            if _resolve(reference) is obj:
+                return reference
+        except (ImportError, AttributeError):
+            pass
+    error = "can't serialize {!r}, it can't be imported by its name".format(obj)
+    raise TypeError(error)
+
+
+def _dump_value(value):
+    # type: (Any) -> str
+    if value is None or isinstance(value, bool):
+        return repr(value)
+    if isinstance(value, six.integer_types):
+        return str(value)
+    if isinstance(value, six.string_types):
+        try:
+            return json.dumps(value)
+        except UnicodeDecodeError:  # non-text `str` on Python 2.7
+            pass
+    if isinstance(value, bytes):
+        return "b" + json.dumps(value.decode("latin-1"))
+    if isinstance(value, _ENUM_TYPES):
+        return "{}.{}".format(_dump_reference(type(value)), getattr(value, "name"))
+    error = "can't serialize literal value {!r}".format(value)
+    raise TypeError(error)
+
+
+def _dump_type_var(type_var):
+    # type: (Any) -> str
+
+    # Type variables declared in modules are referenced by module and name.
+    module = getattr(type_var, "__module__", None)
+    if module and module not in ("typing", "typing_extensions"):
+        reference = "{}:{}".format(module, type_var.__name__)
+        try:
+            if _resolve(reference) is type_var:
+                return "~" + reference
+        except (ImportError, AttributeError):
+            pass
+
+    # Others by definition.
+    prefix = "~**" if isinstance(type_var, _PARAM_SPEC_TYPES) else "~"
+    if getattr(type_var, "__covariant__", False):
+        prefix += "+"
+    elif getattr(type_var, "__contravariant__", False):
+        prefix += "-"
+    definition = prefix + str(type_var.__name__)
+    bound = getattr(type_var, "__bound__", None)
+    constraints = getattr(type_var, "__constraints__", ())
+    if bound is not None and bound is not _NONE_TYPE:
+        definition += "<{}>".format(_dump(bound))
+    elif constraints:
+        definition += "({})".format(",".join(_dump(c) for c in constraints))
+    return definition
+
+
+def _resolve(reference):
+    # type: (str) -> Any
+    try:
+        return _REFERENCES[reference]
+    except KeyError:
+        pass
+    module_name, _, path = reference.partition(":")
+    if path:
+        obj = importlib.import_module(module_name)  # type: Any
+        for part in path.split("."):
+            obj = getattr(obj, part)
+    elif hasattr(builtins, reference):
+        obj = getattr(builtins, reference)
+    else:
+        obj = _member(reference)
+    _REFERENCES[reference] = obj
+    return obj
+
+
+class _Parser(object):
+    """Single-pass parser of serialized type expressions."""
+
+    __slots__ = ("text", "position")
+
+    def __init__(self, text):
+        # type: (str) -> None
+        self.text = text
+        self.position = 0
+
+    def parse(self):
+        # type: () -> Any
+        typ = self._parse_type()
+        if self.position != len(self.text):
+            self._fail("unexpected {!r}".format(self.text[self.position]))
+        return typ
+
+    def _fail(self, message):
+        # type: (str) -> Any
+        error = "invalid type expression {!r} at position {}: {}".format(
+            self.text, self.position, message
+        )
+        raise ValueError(error)
+
+    def _peek(self, token):
+        # type: (str) -> bool
+        return self.text.startswith(token, self.position)
+
+    def _consume(self, token):
+        # type: (str) -> bool
+        if self.text.startswith(token, self.position):
+            self.position += len(token)
+            return True
+        return False
+
+    def _expect(self, token):
+        # type: (str) -> None
+        if not self._consume(token):
+            self._fail("expected {!r}".format(token))
+
+    def _parse_name(self):
+        # type: () -> str
+        match = _NAME.match(self.text, self.position)
+        if match is None:
+            return self._fail("expected name")  # type: ignore
+        self.position = match.end()
+        return match.group()
+
+    def _parse_string(self):
+        # type: () -> str
+        try:
+            string, self.position = _scanstring(self.text, self.position + 1)
+        except ValueError as e:
+            self._fail(str(e))
+        return string  # type: ignore
+
+    def _parse_list(self, parse_item):
+        # type: (Callable[[], Any]) -> List[Any]
+        items = [parse_item()]
+        while self._consume(","):
+            items.append(parse_item())
+        return items
+
+    def _parse_type(self):
+        # type: () -> Any
+        if self._peek('"'):
+            return ForwardRef(self._parse_string())
+        if self._consume("..."):
+            return Ellipsis
+        if self._consume("~"):
+            return self._parse_type_var()
+        if self._consume("["):
+            if self._consume("]"):
+                return []
+            items = self._parse_list(self._parse_type)
+            self._expect("]")
+            return items
+
+        name = self._parse_name()
+        if name == "None":
+            return None
+        form = _resolve(name)
+        if not self._consume("["):
+            return form
+
+        # Arguments.
+        if self._consume("()]"):
+            return form[()]
+        if _is(form, _LITERAL_FORMS):
+            args = self._parse_list(self._parse_value)
+        elif _is(form, _ANNOTATED_FORMS):
+            args = [self._parse_type()]
+            while self._consume(","):
+                args.append(self._parse_value())
+        else:
+            args = self._parse_list(self._parse_type)
+        self._expect("]")
+        return form[args[0] if len(args) == 1 else tuple(args)]
+
+    def _parse_value(self):
+        # type: () -> Any
+        if self._peek('"'):
+            return self._parse_string()
+        if self._peek('b"'):
+            self.position += 1
+            return self._parse_string().encode("latin-1")
+        match = _NUMBER.match(self.text, self.position)
+        if match is not None:
+            self.position = match.end()
+            return int(match.group())
+        name = self._parse_name()
+        if name in ("None", "True", "False"):
+            return {"None": None, "True": True, "False": False}[name]
+
+        # Enum members.
+        reference, _, member = name.rpartition(".")
+        if ":" not in reference:
+            reference, member = name, ""
+        value = _resolve(reference)
+        return getattr(value, member) if member else value
+
+    def _parse_type_var(self):
+        # type: () -> Any
+        start = self.position - 1
+        match = _NAME.match(self.text, self.position)
+        if match is not None and ":" in match.group():
+            self.position = match.end()
+            return _resolve(match.group())
+
+        param_spec = self._consume("**")
+        covariant = self._consume("+")
+        contravariant = not covariant and self._consume("-")
+        name = self._parse_name()
+        bound = None
+        constraints = []  # type: List[Any]
+        if self._consume("<"):
+            bound = self._parse_type()
+            self._expect(">")
+        elif self._consume("("):
+            constraints = self._parse_list(self._parse_type)
+            self._expect(")")
+
+        # The same definition always gets the same type variable.
+        definition = self.text[start : self.position]
+        type_var = _TYPE_VARS.get(definition)
+        if type_var is None:
+            factory = ParamSpec if param_spec else TypeVar  # type: Any
+            type_var = factory(
+                name,
+                *constraints,
+                bound=bound,
+                covariant=covariant,
+                contravariant=contravariant
+            )
+            type_var = _TYPE_VARS.setdefault(definition, type_var)
+        return type_var
@@ -0,0 +1,174 @@
+"""
+Frozen compatibility snapshot of the feature probes `tippo` runs on import.
+
+A snapshot module is generated per interpreter (implementation and version) next to
+this file, and records the outcome of the probes along with a fingerprint of the
+`typing`/`typing_extensions`/`tippo` sources it was generated against. When the
+fingerprint doesn't match anymore (an upgrade, for example), the snapshot is stale
+and `tippo` falls back to live probing, then regenerates it.
+
+Snapshots can also be generated explicitly (at install time, for example) by calling
+`tippo._snapshot.generate()`. Set the ``TIPPO_NO_SNAPSHOT`` environment variable to
+disable them.
+"""
+
+import os
+import sys
+import typing
+
+import typing_extensions
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Tuple, Union
+
+_DISABLE_VARIABLE = "TIPPO_NO_SNAPSHOT"
+_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+_SOURCES = (
+    getattr(typing, "__file__", None),
+    getattr(typing_extensions, "__file__", None),
+    os.path.join(_DIRECTORY, "__init__.py"),
+    os.path.join(_DIRECTORY, "_snapshot.py"),
+)
+
+
+def is_enabled():
+    # type: () -> bool
+    """
+    Get whether snapshots are enabled.
+
+    :return: True if enabled.
+    """
+    return not os.environ.get(_DISABLE_VARIABLE)
+
+
+def get_module_name():
+    # type: () -> str
+    """
+    Get the name of the snapshot module for the current interpreter.
+
+    :return: Module name (relative to the `tippo` package).
+    """
+    if hasattr(sys, "implementation"):
+        implementation = sys.implementation.name
+    elif "__pypy__" in sys.builtin_module_names:
+        implementation = "pypy"
+    else:
+        implementation = "cpython"
+    return "_snapshot_{}_{}".format(
+        implementation, "_".join(str(v) for v in sys.version_info[:3])
+    )
+
+
+def get_path():
+    # type: () -> str
+    """
+    Get the path of the snapshot module for the current interpreter.
+
+    :return: Path.
+    """
+    return os.path.join(_DIRECTORY, get_module_name() + ".py")
+
+
+def fingerprint():
+    # type: () -> Tuple[Union[str, Tuple[str, int, int]], ...]
+    """
+    Get a fingerprint of the interpreter and of the sources the probes depend on.
+
+    :return: Fingerprint.
+    """
+    parts = [sys.version]  # type: List[Union[str, Tuple[str, int, int]]]
+    for path in _SOURCES:
+        if not path:
+            continue
+        if path.endswith((".pyc", ".pyo")) and os.path.exists(path[:-1]):
+            path = path[:-1]
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        parts.append((path, int(stat.st_mtime), int(stat.st_size)))
+    return tuple(parts)
+
+
+def load(module_name=None):
+    # type: (Optional[str]) -> Optional[Dict[str, Any]]
+    """
+    Load the snapshot for the current interpreter.
+
+    :param module_name: Module name override (absolute).
+    :return: Snapshot values or None if disabled, missing, or stale.
+    """
+    if not is_enabled():
+        return None
+    if module_name is None:
+        module_name = "tippo." + get_module_name()
+    try:
+        module = __import__(module_name, fromlist=["SNAPSHOT"])
+    except ImportError:
+        return None
+    if getattr(module, "FINGERPRINT", None) != fingerprint():
+        return None
+    return dict(getattr(module, "SNAPSHOT"))
+
+
+def dump(snapshot, path=None):
+    # type: (Dict[str, Any], Optional[str]) -> str
+    """
+    Write a snapshot module.
+
+    :param snapshot: Snapshot values (literals only).
+    :param path: Path override.
+    :return: Path written to.
+    """
+    if path is None:
+        path = get_path()
+    lines = [
+        "# Generated by tippo._snapshot, do not edit.",
+        "# flake8: noqa",
+        "# fmt: off",
+        "FINGERPRINT = {!r}".format(fingerprint()),
+        "SNAPSHOT = {!r}".format(dict(sorted(snapshot.items()))),
+        "",
+    ]
+
+    # Write to a temporary file first so concurrent processes never read a partial
+    # snapshot.
+    temp_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(temp_path, "w") as fh:
+        fh.write("\n".join(lines))
+    try:
+        os.rename(temp_path, path)
+    except OSError:
+        os.remove(path)  # Windows doesn't allow replacing on rename
+        os.rename(temp_path, path)
+    return path
+
+
+def save(snapshot):
+    # type: (Dict[str, Any]) -> Optional[str]
+    """
+    Write the snapshot for the current interpreter if enabled, ignoring failures
+    such as a read-only installation.
+
+    :param snapshot: Snapshot values (literals only).
+    :return: Path written to or None.
+    """
+    if not is_enabled():
+        return None
+    try:
+        return dump(snapshot)
+    except (IOError, OSError):
+        return None
+
+
+def generate():
+    # type: () -> str
+    """
+    Write the snapshot for the current interpreter from the values `tippo` was
+    initialized with.
+
+    :return: Path written to.
+    """
+    import tippo
+
+    return dump(getattr(tippo, "_SNAPSHOT_VALUES"))
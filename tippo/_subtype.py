@@ -0,0 +1,448 @@
+"""Structural subtype relation between annotations, memoized per pair."""
+
+import collections
+import threading
+import typing
+
+import typing_extensions
+
+from . import (
+    Any,
+    ForwardRef,
+    ParamSpec,
+    TypeVar,
+    _cache,
+    _protocols,
+    get_args,
+    get_builtin,
+    get_origin,
+)
+from ._convert import convert
+from ._hints import get_type_hints_cached
+
+try:
+    import collections.abc as collections_abc
+except ImportError:
+    import collections as collections_abc  # type: ignore  # noqa
+
+if typing.TYPE_CHECKING:
+    from typing import Dict, List, Optional, Set, Tuple
+
+
+def _get_forms(*names):
+    # type: (*str) -> Tuple[Any, ...]
+    forms = []  # type: List[Any]
+    for module in (typing, typing_extensions):
+        for name in names:
+            form = getattr(module, name, None)
+            if form is not None and not _is(form, tuple(forms)):
+                forms.append(form)
+    return tuple(forms)
+
+
+def _is(obj, objs):
+    # type: (Any, Tuple[Any, ...]) -> bool
+    for o in objs:
+        if obj is o:
+            return True
+    return False
+
+
+_NONE_TYPE = type(None)
+_ANY_FORMS = (object,) + _get_forms("Any")
+_NEVER_FORMS = _get_forms("NoReturn", "Never")
+_UNION_FORMS = _get_forms("Union")
+_LITERAL_FORMS = _get_forms("Literal")
+_WRAPPER_FORMS = _get_forms(
+    "Annotated", "ClassVar", "Final", "Required", "NotRequired", "ReadOnly"
+)
+_PARAM_SPEC_TYPES = tuple(
+    t for t in _get_forms("ParamSpec") + (ParamSpec,) if isinstance(t, type)
+)
+_TYPE_VAR_TYPES = (TypeVar,) + _PARAM_SPEC_TYPES
+
+# Implicit promotions (PEP 484).
+_PROMOTIONS = {
+    int: (float, complex),
+    float: (complex,),
+}  # type: Dict[type, Tuple[type, ...]]
+
+# Variance of the parameters of standard generic classes: 1 for covariant, -1 for
+# contravariant and 0 for invariant. Others are read from their type variables.
+_CO, _CONTRA, _INV = 1, -1, 0
+_VARIANCES = {
+    list: (_INV,),
+    set: (_INV,),
+    dict: (_INV, _INV),
+    frozenset: (_CO,),
+    type: (_CO,),
+    collections.deque: (_INV,),
+    collections.defaultdict: (_INV, _INV),
+    collections.Counter: (_INV,),
+}  # type: Dict[Any, Tuple[int, ...]]
+for _name, _variances in (
+    ("Container", (_CO,)),
+    ("Collection", (_CO,)),
+    ("Iterable", (_CO,)),
+    ("Iterator", (_CO,)),
+    ("Reversible", (_CO,)),
+    ("Sequence", (_CO,)),
+    ("MutableSequence", (_INV,)),
+    ("Set", (_CO,)),
+    ("MutableSet", (_INV,)),
+    ("Mapping", (_INV, _CO)),
+    ("MutableMapping", (_INV, _INV)),
+    ("MappingView", (_CO,)),
+    ("KeysView", (_CO,)),
+    ("ValuesView", (_CO,)),
+    ("ItemsView", (_CO, _CO)),
+    ("Awaitable", (_CO,)),
+    ("AsyncIterable", (_CO,)),
+    ("AsyncIterator", (_CO,)),
+    ("Generator", (_CO, _CONTRA, _CO)),
+    ("AsyncGenerator", (_CO, _CONTRA)),
+    ("Coroutine", (_CO, _CONTRA, _CO)),
+):
+    if hasattr(collections_abc, _name):
+        _VARIANCES[getattr(collections_abc, _name)] = _variances
+for _name in ("OrderedDict", "ChainMap"):
+    if hasattr(collections, _name):
+        _VARIANCES[getattr(collections, _name)] = (_INV, _INV)
+del _name, _variances
+
+_MEMO = _cache.LRUCache(maxsize=8192)
+_LOCAL = threading.local()
+
+
+def is_subtype(a, b):
+    # type: (Any, Any) -> bool
+    """
+    Get whether an annotation is a subtype of (is assignable to) another.
+
+    Generic arguments are compared according to the variance of the parameters (read
+    from their type variables, or from the standard variances of builtin collections).
+    Type variables are compared by their upper bounds, and protocols structurally.
+    Results are memoized per pair of (normalized) annotations. Use
+    `is_subtype.cache_info()` to get the cache statistics and `is_subtype.cache_clear()`
+    to clear it.
+
+    :param a: Annotation.
+    :param b: Annotation.
+    :return: True if `a` is a subtype of `b`.
+    :raises TypeError: Unresolved forward reference.
+    """
+    a = _normalize(a)
+    b = _normalize(b)
+    if a is b:
+        return True
+    key = id(a), id(b)
+    entry = _MEMO.get(key)
+    if entry is not _cache.MISSING and entry[0] is a and entry[1] is b:
+        return bool(entry[2])
+
+    # Pairs being compared up the stack are assumed to be subtypes (so that recursive
+    # protocols and generics terminate).
+    try:
+        assumed = _LOCAL.assumed  # type: Set[Tuple[int, int]]
+    except AttributeError:
+        assumed = _LOCAL.assumed = set()
+    if key in assumed:
+        return True
+    assumed.add(key)
+    try:
+        result = _is_subtype(a, b)
+    finally:
+        assumed.discard(key)
+    _MEMO.set(key, (a, b, result))
+    return result
+
+
+setattr(is_subtype, "cache_info", _MEMO.info)
+setattr(is_subtype, "cache_clear", _MEMO.clear)
+
+
+def _normalize(typ):
+    # type: (Any) -> Any
+    if typ is None:
+        return _NONE_TYPE
+    if isinstance(typ, (str, type(""))):
+        typ = ForwardRef(typ)
+    while _is(get_origin(typ), _WRAPPER_FORMS):
+        typ = get_args(typ)[0]
+    return convert(typ, False)
+
+
+def _get_args(typ):
+    # type: (Any) -> Tuple[Any, ...]
+    try:
+        args = tuple(get_args(typ))
+    except IndexError:
+        # typing_inspect can't get the arguments of `Tuple[()]` on Python 2.7.
+        args = tuple(getattr(typ, "__args__", None) or ())
+    if args == ((),):
+        return ()
+    return args
+
+
+def _get_upper_bound(type_var):
+    # type: (Any) -> Any
+    if isinstance(type_var, _PARAM_SPEC_TYPES):
+        return Ellipsis
+    if getattr(type_var, "__bound__", None) is not None:
+        return type_var.__bound__
+    constraints = getattr(type_var, "__constraints__", ())
+    if constraints:
+        return typing.Union[constraints]
+    return object
+
+
+def _is_typed_dict(typ):
+    # type: (Any) -> bool
+    return isinstance(typ, type) and issubclass(typ, dict) and hasattr(typ, "__total__")
+
+
+def _is_subtype(a, b):
+    # type: (Any, Any) -> bool
+    if _is(b, _ANY_FORMS) or _is(a, _ANY_FORMS[1:]) or _is(a, _NEVER_FORMS):
+        return True
+    if _is(b, _NEVER_FORMS) or _is(a, _ANY_FORMS):
+        return False
+
+    a_origin = get_origin(a)
+    b_origin = get_origin(b)
+
+    # Unions.
+    if _is(a_origin, _UNION_FORMS):
+        return all(is_subtype(x, b) for x in _get_args(a))
+    if _is(b_origin, _UNION_FORMS):
+        return any(is_subtype(a, y) for y in _get_args(b))
+
+    # Type variables.
+    if isinstance(a, _TYPE_VAR_TYPES) or isinstance(b, _TYPE_VAR_TYPES):
+        if isinstance(a, _TYPE_VAR_TYPES):
+            a = _get_upper_bound(a)
+        if isinstance(b, _TYPE_VAR_TYPES):
+            b = _get_upper_bound(b)
+        return a is Ellipsis or b is Ellipsis or is_subtype(a, b)
+
+    # Forward references.
+    if isinstance(a, ForwardRef) or isinstance(b, ForwardRef):
+        if a == b:
+            return True
+        error = "can't compare unresolved forward references {!r} and {!r}".format(a, b)
+        raise TypeError(error)
+
+    # Literals.
+    if _is(a_origin, _LITERAL_FORMS):
+        a_values = set((type(v), v) for v in _get_args(a))
+        if _is(b_origin, _LITERAL_FORMS):
+            return a_values.issubset((type(v), v) for v in _get_args(b))
+        return all(is_subtype(t, b) for t, _ in a_values)
+    if _is(b_origin, _LITERAL_FORMS):
+        return False
+
+    # NewType.
+    a_supertype = getattr(a, "__supertype__", None)
+    if getattr(b, "__supertype__", None) is not None:
+        return a_supertype is not None and is_subtype(a_supertype, b)
+    if a_supertype is not None:
+        return is_subtype(a_supertype, b)
+
+    # Typed dictionaries.
+    if _is_typed_dict(b):
+        return _is_typed_dict(a) and _is_typed_dict_subtype(a, b)
+    if _is_typed_dict(a):
+        return is_subtype(typing.Mapping[str, object], b)
+
+    a_cls = get_builtin(a_origin if a_origin is not None else a)
+    b_cls = get_builtin(b_origin if b_origin is not None else b)
+    if not isinstance(a_cls, type) or not isinstance(b_cls, type):
+        return bool(a == b)
+
+    # Nominal or structural (protocols) class relationship.
+    if not _is_subclass(a_cls, b_cls):
+        if not _protocols.is_protocol(b_cls):
+            return False
+        return _implements(a_cls, b_cls)
+
+    b_args = _get_args(b) if b_origin is not None else ()
+    if not b_args:
+        return True
+
+    # Special cases.
+    if _is(b_cls, (collections_abc.Callable,)):
+        return _is_callable_subtype(a, a_cls, b_args)
+    if b_cls is tuple:
+        return _is_tuple_subtype(a, a_cls, b_args)
+
+    # Project the arguments of `a` onto the parameters of `b` and compare them.
+    a_args = _project(a, a_cls, b_cls, len(b_args))
+    variances = _get_variances(b_cls, b, len(b_args))
+    for x, y, variance in zip(a_args, b_args, variances):
+        if not _compare(x, y, variance):
+            return False
+    return True
+
+
+def _is_subclass(a_cls, b_cls):
+    # type: (type, type) -> bool
+    try:
+        if issubclass(a_cls, b_cls):
+            return True
+    except TypeError:
+        return False
+    for promotion in _PROMOTIONS.get(a_cls, ()):
+        if issubclass(promotion, b_cls):
+            return True
+    return False
+
+
+def _compare(x, y, variance):
+    # type: (Any, Any, int) -> bool
+    if isinstance(x, list) or isinstance(y, list):
+        if x is Ellipsis or y is Ellipsis:
+            return True
+        if not isinstance(x, list) or not isinstance(y, list) or len(x) != len(y):
+            return False
+        return all(_compare(xi, yi, variance) for xi, yi in zip(x, y))
+    if variance == _CO:
+        return is_subtype(x, y)
+    if variance == _CONTRA:
+        return is_subtype(y, x)
+    return is_subtype(x, y) and is_subtype(y, x)
+
+
+def _get_variances(cls, typ, count):
+    # type: (type, Any, int) -> Tuple[int, ...]
+    variances = _VARIANCES.get(cls)
+    if variances is None:
+        parameters = getattr(cls, "__parameters__", None) or ()
+        variances = tuple(
+            (
+                _CO
+                if getattr(p, "__covariant__", False)
+                else _CONTRA if getattr(p, "__contravariant__", False) else _INV
+            )
+            for p in parameters
+        )
+    return (variances + (_INV,) * count)[:count]
+
+
+def _project(a, a_cls, b_cls, count):
+    # type: (Any, type, type, int) -> Tuple[Any, ...]
+    """Get the arguments of `a` as arguments of its base `b_cls`."""
+    a_args = _get_args(a) if get_origin(a) is not None else ()
+    if not a_args:
+        if a_cls is tuple or a_cls is b_cls:
+            return (Any,) * count
+        a_args = (Any,) * len(getattr(a_cls, "__parameters__", None) or ())
+
+    # Generic classes: substitute the arguments along the original bases.
+    projected = _project_bases(a_cls, a_args, b_cls)
+    if projected is not None:
+        return (tuple(projected) + (Any,) * count)[:count]
+
+    # Standard classes share their leading parameters with their bases.
+    if issubclass(a_cls, collections.Counter) and count == 2:
+        return (a_args[0] if a_args else Any, int)
+    if a_cls is tuple and a_args:
+        if len(a_args) == 2 and a_args[1] is Ellipsis:
+            element = a_args[0]
+        else:
+            element = typing.Union[a_args]
+        return (element,) * count
+    return (tuple(a_args) + (Any,) * count)[:count]
+
+
+def _project_bases(cls, args, target):
+    # type: (type, Tuple[Any, ...], type) -> Optional[Tuple[Any, ...]]
+    if cls is target:
+        return args
+    parameters = getattr(cls, "__parameters__", None) or ()
+    substitutions = dict(zip(parameters, args))
+    for base in getattr(cls, "__orig_bases__", ()):
+        base_cls = get_builtin(get_origin(base) or base)
+        if not isinstance(base_cls, type) or not _is_subclass(base_cls, target):
+            continue
+        base_args = tuple(_substitute(a, substitutions) for a in _get_args(base))
+        projected = _project_bases(base_cls, base_args, target)
+        if projected is None and base_cls is not target:
+            return base_args
+        return projected
+    return None
+
+
+def _substitute(arg, substitutions):
+    # type: (Any, Dict[Any, Any]) -> Any
+    if isinstance(arg, _TYPE_VAR_TYPES):
+        return substitutions.get(arg, Any)
+    parameters = getattr(arg, "__parameters__", None)
+    if parameters and get_origin(arg) is not None:
+        values = tuple(substitutions.get(p, Any) for p in parameters)
+        return arg[values if len(values) > 1 else values[0]]
+    return arg
+
+
+def _is_callable_subtype(a, a_cls, b_args):
+    # type: (Any, type, Tuple[Any, ...]) -> bool
+    a_args = _get_args(a) if get_origin(a) is not None else ()
+    if not _is(a_cls, (collections_abc.Callable,)) or not a_args:
+        return True
+    (a_params, a_return), (b_params, b_return) = a_args, b_args
+    if not is_subtype(a_return, b_return):
+        return False
+    return _compare(a_params, b_params, _CONTRA)
+
+
+def _is_tuple_subtype(a, a_cls, b_args):
+    # type: (Any, type, Tuple[Any, ...]) -> bool
+    a_args = _get_args(a) if get_origin(a) is not None else None
+    if a_args is None or get_origin(a) is None:
+        return True
+    a_variadic = len(a_args) == 2 and a_args[1] is Ellipsis
+    b_variadic = len(b_args) == 2 and b_args[1] is Ellipsis
+    if b_variadic:
+        elements = a_args[:1] if a_variadic else a_args
+        return all(is_subtype(x, b_args[0]) for x in elements)
+    if a_variadic or len(a_args) != len(b_args):
+        return False
+    return all(is_subtype(x, y) for x, y in zip(a_args, b_args))
+
+
+def _implements(cls, protocol):
+    # type: (type, type) -> bool
+    defined, declared = _protocols.get_members(protocol)
+    for name in defined:
+        if getattr(cls, name, None) is None:
+            return False
+    if declared:
+        annotations = set()  # type: Set[str]
+        for base in getattr(cls, "__mro__", ()):
+            annotations.update(base.__dict__.get("__annotations__", {}))
+        for name in declared:
+            if name not in annotations and not hasattr(cls, name):
+                return False
+    return True
+
+
+def _is_typed_dict_subtype(a, b):
+    # type: (Any, Any) -> bool
+    a_hints = get_type_hints_cached(a)
+    b_hints = get_type_hints_cached(b)
+    a_required = _get_required_keys(a, a_hints)
+    b_required = _get_required_keys(b, b_hints)
+    for key, b_hint in b_hints.items():
+        if key not in a_hints or (key in a_required) != (key in b_required):
+            return False
+        a_hint = a_hints[key]
+        if not is_subtype(a_hint, b_hint) or not is_subtype(b_hint, a_hint):
+            return False
+    return True
+
+
+def _get_required_keys(typed_dict, hints):
+    # type: (Any, Dict[str, Any]) -> typing.FrozenSet[str]
+    required = getattr(typed_dict, "__required_keys__", None)
+    if required is None:
+        required = hints if getattr(typed_dict, "__total__", True) else ()
+    return frozenset(required)
@@ -0,0 +1,177 @@
+"""Iterative traversal of type expressions."""
+
+import typing
+
+import typing_extensions
+
+from . import _cache, get_args, get_origin
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+    Path = Tuple[int, ...]
+    Node = Tuple[Any, Tuple[Any, ...], Tuple[Tuple[int, Any], ...]]
+    Step = Tuple[Path, Any, Any, Tuple[Any, ...]]
+    Prune = Callable[[Path, Any, Any, Tuple[Any, ...]], bool]
+
+
+def _get_forms(*names):
+    # type: (*str) -> Tuple[Any, ...]
+    forms = []  # type: List[Any]
+    for module in (typing, typing_extensions):
+        for name in names:
+            form = getattr(module, name, None)
+            if form is not None and not any(form is f for f in forms):
+                forms.append(form)
+    return tuple(forms)
+
+
+def _is(obj, objs):
+    # type: (Any, Tuple[Any, ...]) -> bool
+    for o in objs:
+        if obj is o:
+            return True
+    return False
+
+
+_LITERAL_FORMS = _get_forms("Literal")
+_ANNOTATED_FORMS = _get_forms("Annotated")
+
+# Origin, arguments, and children (with their argument index) per node.
+_NODES = _cache.IdentityCache(maxsize=4096)
+
+
+def get_node(typ):
+    # type: (Any) -> Node
+    """
+    Get the origin, arguments, and children (type expressions nested in the
+    arguments, along with their index) of a type expression.
+
+    Results are cached per object identity.
+
+    :param typ: Type expression.
+    :return: Origin, arguments, and children.
+    """
+    node = _NODES.get(typ)  # type: Node
+    if node is _cache.MISSING:
+        node = _get_node(typ)
+        _NODES.set(typ, node)
+    return node
+
+
+def _get_node(typ):
+    # type: (Any) -> Node
+    if isinstance(typ, list):
+        args = tuple(typ)  # callable arguments
+        return None, args, tuple(enumerate(args))
+    origin = get_origin(typ)
+    if origin is None:
+        return None, (), ()
+    try:
+        args = tuple(get_args(typ))
+    except IndexError:
+        # typing_inspect can't get the arguments of `Tuple[()]` on Python 2.7.
+        args = tuple(getattr(typ, "__args__", None) or ())
+    if args == ((),):
+        args = ()
+    if _is(origin, _LITERAL_FORMS):
+        return origin, args, ()  # values
+    if _is(origin, _ANNOTATED_FORMS):
+        return origin, args, ((0, args[0]),)  # metadata
+    return origin, args, tuple(enumerate(args))
+
+
+def walk(typ, prune=None):
+    # type: (Any, Optional[Prune]) -> Iterator[Step]
+    """
+    Walk a type expression depth-first (pre-order), without recursion.
+
+    Yields the path to each node (the argument indexes from the root), the node, its
+    origin, and its arguments. The arguments of `Literal` (values) and the metadata of
+    `Annotated` are not walked into. Nodes are yielded for callable argument lists too.
+
+    :param typ: Type expression.
+    :param prune: Function that gets called with the same values that get yielded,
+        and returns True to skip the children of a node.
+    :return: Iterator of path, node, origin, and arguments.
+    """
+    stack = [((), typ)]  # type: List[Tuple[Path, Any]]
+    while stack:
+        path, node = stack.pop()
+        origin, args, children = get_node(node)
+        yield path, node, origin, args
+        if children and (prune is None or not prune(path, node, origin, args)):
+            for index, child in reversed(children):
+                stack.append((path + (index,), child))
+
+
+class TypeVisitor(object):
+    """
+    Base class for visitors of type expressions.
+
+    Subclasses implement `enter` (pre-order) and/or `leave` (post-order), and call
+    `visit` to traverse a type expression without recursion.
+    """
+
+    __slots__ = ()
+
+    def enter(self, path, node, origin, args):
+        # type: (Path, Any, Any, Tuple[Any, ...]) -> bool
+        """
+        Called before visiting the children of a node.
+
+        :param path: Argument indexes from the root.
+        :param node: Type expression.
+        :param origin: Origin (or None).
+        :param args: Arguments.
+        :return: False to skip the children.
+        """
+        return True
+
+    def leave(self, path, node, origin, args, results):
+        # type: (Path, Any, Any, Tuple[Any, ...], List[Any]) -> Any
+        """
+        Called after visiting the children of a node.
+
+        :param path: Argument indexes from the root.
+        :param node: Type expression.
+        :param origin: Origin (or None).
+        :param args: Arguments.
+        :param results: Results of `leave` for the children that were visited.
+        :return: Result for this node.
+        """
+        return None
+
+    def visit(self, typ):
+        # type: (Any) -> Any
+        """
+        Visit a type expression.
+
+        :param typ: Type expression.
+        :return: Result of `leave` for the root node.
+        """
+        root_results = []  # type: List[Any]
+
+        # Frames of path, node, origin, arguments, children, next child index, results,
+        # and the results of the parent.
+        stack = []  # type: List[List[Any]]
+
+        def push(path, node, parent_results):
+            # type: (Path, Any, List[Any]) -> None
+            origin, args, children = get_node(node)
+            if not self.enter(path, node, origin, args):
+                children = ()
+            stack.append([path, node, origin, args, children, 0, [], parent_results])
+
+        push((), typ, root_results)
+        while stack:
+            frame = stack[-1]
+            path, node, origin, args, children, index, results, parent_results = frame
+            if index < len(children):
+                frame[5] = index + 1
+                child_index, child = children[index]
+                push(path + (child_index,), child, results)
+            else:
+                stack.pop()
+                parent_results.append(self.leave(path, node, origin, args, results))
+        return root_results[0]
@@ -0,0 +1,211 @@
+"""
+Import-time profile of `tippo`.
+
+Imports `tippo` in a fresh interpreter with its import phases instrumented, and
+reports the time (and, where `tracemalloc` is available, the memory) spent in each of
+them::
+
+    python -m tippo.importprofile [--json] [--repeat N] [--no-snapshot]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import typing
+
+if typing.TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional
+
+# Runs in the fresh interpreter: imports `tippo` and writes its phases as JSON.
+_SCRIPT = """
+import json, sys, time
+timer = getattr(time, "perf_counter", time.time)
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+if tracemalloc is not None and sys.argv[1] == "1":
+    tracemalloc.start()
+
+def mark(phase):
+    current, peak = 0, -1
+    if tracemalloc is not None and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        else:
+            peak = -1
+    return phase, timer(), current, peak
+
+# Import tippo's dependencies first, so that their cost is reported separately.
+phases = [mark("")]
+for name in ("typing", "typing_extensions", "collections.abc", "weakref"):
+    try:
+        __import__(name)
+    except ImportError:
+        continue
+    phases.append(mark("import " + name))
+import tippo
+phases.extend(sys.modules["tippo"]._PHASES)
+phases.append(mark("module"))
+
+# Modules imported on first use only.
+deferred = []
+if "_typing_inspect_get_origin" in vars(sys.modules["tippo"]):
+    if "typing_inspect" not in sys.modules:
+        deferred.append(mark(""))
+        tippo.get_origin(tippo.List[int])
+        deferred.append(mark("typing_inspect"))
+
+sys.stdout.write(json.dumps({"phases": phases, "deferred": deferred}))
+"""
+
+
+def profile(repeat=1, snapshot=True, trace_memory=True):
+    # type: (int, bool, bool) -> Dict[str, Any]
+    """
+    Profile the import of `tippo` in fresh interpreters.
+
+    :param repeat: Number of imports (the minimum time of each phase is reported).
+    :param snapshot: Whether to use the compatibility snapshot (False to probe live).
+    :param trace_memory: Whether to trace memory allocations (Python 3 only).
+    :return: Results (JSON-serializable).
+    """
+    if repeat < 1:
+        error = "repeat must be at least 1, got {}".format(repeat)
+        raise ValueError(error)
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["TIPPO_IMPORT_PROFILE"] = "1"
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (root, env.get("PYTHONPATH")) if p)
+    if not snapshot:
+        env["TIPPO_NO_SNAPSHOT"] = "1"
+    command = [sys.executable, "-c", _SCRIPT, "1" if trace_memory else "0"]
+
+    runs = []  # type: List[Dict[str, List[Any]]]
+    for _ in range(repeat):
+        output = subprocess.check_output(command, env=env)
+        runs.append(json.loads(output.decode("utf-8")))
+
+    phases = _get_phases([run["phases"] for run in runs])
+    deferred = _get_phases([run["deferred"] for run in runs])
+    return {
+        "python": ".".join(str(v) for v in sys.version_info[:3]),
+        "snapshot": snapshot,
+        "repeat": repeat,
+        "phases": phases,
+        "total": _get_total(phases),
+        "deferred": deferred,
+    }
+
+
+def _get_phases(runs):
+    # type: (List[List[Any]]) -> List[Dict[str, Any]]
+    phases = []  # type: List[Dict[str, Any]]
+    for i in range(1, len(runs[0])):
+        name, timestamp, current, peak = runs[0][i]
+        _, previous_timestamp, previous_current, _ = runs[0][i - 1]
+        times = [r[i][1] - r[i - 1][1] for r in runs if len(r) == len(runs[0])]
+        phases.append(
+            {
+                "phase": name,
+                "time": min(times),
+                "memory": current - previous_current,
+                "peak": (peak - previous_current) if peak >= 0 else None,
+            }
+        )
+    return phases
+
+
+def _get_total(phases):
+    # type: (List[Dict[str, Any]]) -> Dict[str, Any]
+    peaks = [p["peak"] for p in phases if p["peak"] is not None]
+    return {
+        "phase": "total",
+        "time": sum(p["time"] for p in phases),
+        "memory": sum(p["memory"] for p in phases),
+        "peak": max(peaks) if peaks else None,
+    }
+
+
+def format_table(results):
+    # type: (Dict[str, Any]) -> str
+    """
+    Format profile results as a table.
+
+    :param results: Results from `profile`.
+    :return: Table.
+    """
+    template = "{:<32} {:>10} {:>12} {:>12}"
+    lines = [
+        "tippo import profile (Python {}, {})".format(
+            results["python"], "snapshot" if results["snapshot"] else "no snapshot"
+        ),
+        template.format("phase", "time (ms)", "memory (KiB)", "peak (KiB)"),
+    ]
+
+    def add(phase):
+        # type: (Dict[str, Any]) -> None
+        lines.append(
+            template.format(
+                phase["phase"],
+                "{:.3f}".format(phase["time"] * 1000),
+                "{:.1f}".format(phase["memory"] / 1024.0),
+                (
+                    "-"
+                    if phase["peak"] is None
+                    else "{:.1f}".format(phase["peak"] / 1024.0)
+                ),
+            )
+        )
+
+    for phase in results["phases"]:
+        add(phase)
+    add(results["total"])
+    for phase in results["deferred"]:
+        add(dict(phase, phase="(on first use) {}".format(phase["phase"])))
+    return "\n".join(lines)
+
+
+def main(args=None):
+    # type: (Optional[List[str]]) -> int
+    """
+    Command line entry point.
+
+    :param args: Arguments (defaults to `sys.argv`).
+    :return: Exit status.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m tippo.importprofile",
+        description="Profile the import of tippo per phase.",
+    )
+    parser.add_argument("--json", action="store_true", help="output JSON")
+    parser.add_argument("--repeat", type=int, default=5, help="number of imports")
+    parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="ignore the compatibility snapshot (probe live)",
+    )
+    parser.add_argument(
+        "--no-tracemalloc", action="store_true", help="don't trace memory"
+    )
+    options = parser.parse_args(args)
+
+    results = profile(
+        repeat=options.repeat,
+        snapshot=not options.no_snapshot,
+        trace_memory=not options.no_tracemalloc,
+    )
+    if options.json:
+        print(json.dumps(results, indent=2, separators=(",", ": "), sort_keys=True))
+    else:
+        print(format_table(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())